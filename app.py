@@ -3,15 +3,24 @@ import re
 import json
 import hashlib
 import secrets
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import (Flask, render_template, abort, request, jsonify,
                    session, redirect, url_for, flash)
-import markdown
-import yaml
 
 # 导入数据库模块
-from database import init_database, get_post_from_db, get_posts_from_db, search_in_db, increment_views
+from database import (init_database, get_post_from_db, get_posts_from_db, search_in_db, increment_views,
+                      fts_available, search_fts, sync_posts_from_files)
 from models import Post, Tag
+from corpus import (POSTS_DIR, corpus, get_all_posts, get_post,
+                    get_listing, paginate, get_neighbours, get_aggregates)
+from watcher import start_watcher
+import db_posts
+from related import get_related
+from view_buffer import view_buffer
+from jobs import job_runner
+from view_stats import top_posts_since, view_series, SERIES_GROUPS, SERIES_INTERVALS
+from search_index import (search_posts, suggest_posts, search_snippets, cursor_for, cursor_key,
+                          cursor_offset, encode_cursor, MAX_SEARCH_OFFSET)
 
 app = Flask(__name__)
 
@@ -31,9 +40,35 @@ if not _secret:
     _secret = secrets.token_hex(32)
 app.secret_key = _secret
 
-POSTS_DIR = os.path.join(os.path.dirname(__file__), "posts")
 USERS_FILE = os.path.join(os.path.dirname(__file__), "users.json")
 
+# 设置后，管理后台修改文章会在后台增量更新静态导出（见 freeze.py）
+FREEZE_DIR = os.environ.get("BLOG_FREEZE_DIR")
+
+# 站内搜索后端：index = 内存倒排索引（默认），fts = SQLite FTS5（需先 sync_db.py 同步）
+SEARCH_BACKEND = os.environ.get("BLOG_SEARCH_BACKEND", "index").lower()
+
+# 搜索接口每页默认 / 最大条数
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_LIMIT = 50
+
+# 列表页每页文章数
+POSTS_PER_PAGE = int(os.environ.get("BLOG_POSTS_PER_PAGE", "20"))
+
+# 公开页面的数据来源：files = 解析 posts/ 下的 Markdown（默认），db = 读取 sync_db.py 同步后的数据库
+SERVE_FROM = os.environ.get("BLOG_SERVE_FROM", "files").lower()
+
+# 监听 posts/ 变更（爬虫写入等），增量更新内存中的文章索引
+# 不在导入时启动：gunicorn --preload 等导入后才 fork 的部署中，线程不会被子进程继承，
+# 由每个 worker 在处理第一个请求前各自启动；命令行脚本导入 app 时也不会启动
+post_watcher = start_watcher(corpus, start=False)
+
+
+@app.before_request
+def ensure_post_watcher():
+    if post_watcher is not None:
+        post_watcher.ensure_started()
+
 
 # ── 用户管理 ──────────────────────────────────────────────────────────────────
 
@@ -65,139 +100,42 @@ def login_required(f):
     return decorated
 
 
-# ── 核心：解析 Markdown 文件 ──────────────────────────────────────────────────
-
-def parse_post(filepath: str) -> dict | None:
-    """解析单篇文章，支持 posts/ 下任意子目录"""
-    if not os.path.exists(filepath):
-        return None
-
-    with open(filepath, "r", encoding="utf-8") as f:
-        raw = f.read()
-
-    front_matter = {}
-    content = raw
-    fm_match = re.match(r"^---\s*\n(.*?)\n---\s*\n", raw, re.DOTALL)
-    if fm_match:
-        try:
-            front_matter = yaml.safe_load(fm_match.group(1)) or {}
-        except yaml.YAMLError:
-            pass
-        content = raw[fm_match.end():]
+def site_aggregates() -> dict:
+    """分类 / 标签统计，按 SERVE_FROM 取自数据库或内存语料"""
+    return db_posts.get_aggregates() if SERVE_FROM == "db" else get_aggregates()
 
-    # slug 使用相对于 posts/ 的路径，例如 ai/2026-02-26-ai-news-digest
-    rel_path = os.path.relpath(filepath, POSTS_DIR)
-    slug = rel_path.replace("\\", "/").replace(".md", "")
 
-    # 分类（子目录名称），例如 ai、finance
-    parts = slug.split("/")
-    category = parts[0] if len(parts) > 1 else "general"
-
-    filename = os.path.basename(filepath)
-
-    date = front_matter.get("date")
-    if not date:
-        # 优先尝试带时分的格式：2026-03-08-1430-xxx.md
-        dt_match = re.match(r"(\d{4}-\d{2}-\d{2})-(\d{4})", filename)
-        if dt_match:
-            try:
-                date = datetime.strptime(dt_match.group(1) + dt_match.group(2), "%Y-%m-%d%H%M")
-            except ValueError:
-                date = None
-        else:
-            date_match = re.match(r"(\d{4}-\d{2}-\d{2})", filename)
-            if date_match:
-                try:
-                    date = datetime.strptime(date_match.group(1), "%Y-%m-%d").date()
-                except ValueError:
-                    date = None
-    if isinstance(date, str):
-        for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
-            try:
-                date = datetime.strptime(date, fmt)
-                if fmt == "%Y-%m-%d":
-                    date = date.date()
-                break
-            except ValueError:
-                continue
-        else:
-            date = None
+def listing_page(category: str = None, tag: str = None) -> dict:
+    """当前请求页的文章列表（分页结构见 corpus.paginate）"""
+    if SERVE_FROM == "db":
+        return db_posts.get_listing_page(category, tag, get_page_arg(), POSTS_PER_PAGE)
+    posts = get_aggregates()["tag_posts"].get(tag, []) if tag else get_listing(category)
+    return paginate(posts, get_page_arg(), POSTS_PER_PAGE)
 
-    tags = front_matter.get("tags", [])
-    if isinstance(tags, str):
-        tags = [t.strip() for t in tags.split(",")]
 
-    md = markdown.Markdown(
-        extensions=["fenced_code", "tables", "toc", "codehilite", "nl2br"],
-        extension_configs={"codehilite": {"linenums": False}},
-    )
-    html_content = md.convert(content)
-
-    return {
-        "slug": slug,
-        "category": category,
-        "filename": filename,
-        "filepath": filepath,
-        "title": front_matter.get("title", filename),
-        "date": date,
-        "date_str": (date.strftime("%Y年%m月%d日 %H:%M") if hasattr(date, 'hour') else date.strftime("%Y年%m月%d日")) if date else "未知日期",
-        "tags": tags,
-        "summary": front_matter.get("summary", content[:120].strip() + "..."),
-        "content": html_content,
-        "toc": getattr(md, "toc", ""),
-        "raw": raw,
-    }
-
-
-def get_all_posts(category: str = None) -> list:
-    """递归扫描 posts/ 及其所有子目录，返回所有文章"""
-    if not os.path.exists(POSTS_DIR):
-        os.makedirs(POSTS_DIR)
-        return []
-
-    posts = []
-    for root, dirs, files in os.walk(POSTS_DIR):
-        # 忽略隐藏目录
-        dirs[:] = [d for d in dirs if not d.startswith(".")]
-        for filename in files:
-            if not filename.endswith(".md"):
-                continue
-            filepath = os.path.join(root, filename)
-            post = parse_post(filepath)
-            if post:
-                # 如果指定了分类则过滤
-                if category and post["category"] != category:
-                    continue
-                posts.append(post)
-
-    def sort_key(p):
-        d = p["date"]
-        if d is None:
-            return datetime.min
-        if isinstance(d, datetime):
-            return d
-        return datetime(d.year, d.month, d.day)
-
-    posts.sort(key=sort_key, reverse=True)
-    return posts
-
-
-def get_all_tags(posts: list) -> dict:
-    tag_count = {}
-    for post in posts:
-        for tag in post["tags"]:
-            tag_count[tag] = tag_count.get(tag, 0) + 1
-    return dict(sorted(tag_count.items(), key=lambda x: x[1], reverse=True))
+def get_all_tags(category: str = None) -> dict:
+    """获取标签及其文章数量（按数量倒序），指定分类时只统计该分类"""
+    aggregates = site_aggregates()
+    if category:
+        return aggregates["category_tags"].get(category, {})
+    return aggregates["tags"]
 
 
 def get_all_categories() -> dict:
     """获取所有分类及其文章数量"""
-    posts = get_all_posts()
-    cat_count = {}
-    for post in posts:
-        cat = post["category"]
-        cat_count[cat] = cat_count.get(cat, 0) + 1
-    return cat_count
+    return site_aggregates()["categories"]
+
+
+def post_files_changed():
+    """
+    管理后台写入文章后调用：数据库取文时在后台增量同步到数据库（与后台同步共用 single-flight 锁，
+    同步进行中则结束后补跑一次），配置了静态导出目录时触发增量导出
+    """
+    if SERVE_FROM == "db":
+        job_runner.start("sync", run_sync_job, rerun=True)
+    if FREEZE_DIR:
+        from freeze import schedule_freeze
+        schedule_freeze(FREEZE_DIR)
 
 
 def make_filename(title: str, date: str = None) -> str:
@@ -260,171 +198,200 @@ CAT_NAMES = {
 @app.route("/blog")
 def index():
     categories = get_all_categories()
-    posts = get_all_posts()
-    recent_posts = posts[:6] if posts else []
+    if SERVE_FROM == "db":
+        recent_posts = db_posts.get_listing_page(per_page=6)["items"]
+    else:
+        recent_posts = get_listing()[:6]
     return render_template("categories.html", categories=categories, cat_icons=CAT_ICONS, cat_names=CAT_NAMES, recent_posts=recent_posts)
 
 
 @app.route("/blog/posts")
 def all_posts():
-    posts = get_all_posts()
-    tags = get_all_tags(posts)
+    pagination = listing_page()
+    tags = get_all_tags()
     categories = get_all_categories()
-    return render_template("index.html", posts=posts, tags=tags, categories=categories)
+    return render_template("index.html", posts=pagination["items"], pagination=pagination,
+                           tags=tags, categories=categories)
 
 
 @app.route("/blog/category/<category>")
 def category_filter(category: str):
-    posts = get_all_posts(category=category)
-    tags = get_all_tags(posts)
+    pagination = listing_page(category)
+    tags = get_all_tags(category)
     categories = get_all_categories()
-    return render_template("index.html", posts=posts, tags=tags, categories=categories, active_category=category)
+    return render_template("index.html", posts=pagination["items"], pagination=pagination,
+                           tags=tags, categories=categories, active_category=category)
 
 
 @app.route("/blog/<path:slug>")
 def post_detail(slug: str):
     # slug 可能是 ai/2026-02-26-ai-news-digest
-    filepath = os.path.join(POSTS_DIR, slug + ".md")
-    post = parse_post(filepath)
-    if not post:
-        abort(404)
-
-    all_posts = get_all_posts()
-    slugs = [p["slug"] for p in all_posts]
-    idx = slugs.index(slug) if slug in slugs else -1
-    prev_post = all_posts[idx + 1] if idx >= 0 and idx + 1 < len(all_posts) else None
-    next_post = all_posts[idx - 1] if idx > 0 else None
+    post = db_posts.get_post(slug) if SERVE_FROM == "db" else None
+    if post:
+        prev_post, next_post = db_posts.get_neighbours(post)
+        cat_prev, cat_next = db_posts.get_neighbours(post, same_category=True)
+        post_id, db_views = post["id"], post["views"]
+    else:
+        # 文件模式，或数据库中尚未同步该文章时回退到解析 Markdown
+        post = get_post(slug)
+        if not post:
+            abort(404)
+        prev_post, next_post = get_neighbours(slug)
+        cat_prev, cat_next = get_neighbours(slug, same_category=True)
+        db_post = get_post_from_db(slug)
+        post_id, db_views = (db_post.id, db_post.views) if db_post else (None, 0)
+    related_posts = get_related(slug)
 
     # 记录阅读量到数据库
-    db_post = get_post_from_db(slug)
     views = 0
-    if db_post:
-        ip_address = get_client_ip()
-        user_agent = request.headers.get('User-Agent', '')
-        views = increment_views(db_post.id, ip_address, user_agent)
+    if post_id is not None and not request.environ.get("blog.freeze"):
+        if is_prefetch():
+            # 浏览器预取 / 预渲染不计数，只显示当前阅读量
+            views = (db_views or 0) + view_buffer.pending(post_id)
+        else:
+            ip_address = get_client_ip()
+            user_agent = request.headers.get('User-Agent', '')
+            views = increment_views(post_id, ip_address, user_agent, db_views)
 
-    return render_template("post.html", post=post, prev_post=prev_post, next_post=next_post, views=views)
+    return render_template("post.html", post=post, prev_post=prev_post, next_post=next_post,
+                           cat_prev=cat_prev, cat_next=cat_next, related_posts=related_posts,
+                           views=views)
 
 
 @app.route("/blog/tag/<tag>")
 def tag_filter(tag: str):
-    all_posts = get_all_posts()
-    posts = [p for p in all_posts if tag in p["tags"]]
-    tags = get_all_tags(all_posts)
+    pagination = listing_page(tag=tag)
+    tags = get_all_tags()
     categories = get_all_categories()
-    return render_template("index.html", posts=posts, tags=tags, categories=categories, active_tag=tag)
+    return render_template("index.html", posts=pagination["items"], pagination=pagination,
+                           tags=tags, categories=categories, active_tag=tag)
 
 
 @app.route("/blog/search")
 def search():
+    """
+    站内搜索，返回 {"results": [...], "next_cursor": 下一页游标或 null}
+    参数：q、limit（默认 20，最多 50）、cursor（上一页返回的 next_cursor）、
+    category、tag、from / to（YYYY-MM-DD，包含首尾两天）
+    """
     q = request.args.get("q", "").strip()
     if not q:
-        return jsonify([])
-
-    q_lower = q.lower()
+        return jsonify({"results": [], "next_cursor": None})
+
+    limit = request.args.get("limit", SEARCH_PAGE_SIZE, type=int) or SEARCH_PAGE_SIZE
+    limit = min(max(limit, 1), SEARCH_MAX_LIMIT)
+    cursor = request.args.get("cursor")
+    filters = get_search_filters()
+
+    # 多取一条用于判断是否还有下一页
+    if SEARCH_BACKEND == "fts" and fts_available():
+        offset = cursor_offset(cursor)
+        results = search_with_fts(q, limit + 1, offset, filters)
+        has_next = len(results) > limit and offset + limit <= MAX_SEARCH_OFFSET
+        next_cursor = encode_cursor(offset + limit) if has_next else None
+        return jsonify({"results": results[:limit], "next_cursor": next_cursor})
+
+    # 倒排索引查询：分数沿用原有字段权重，堆选择前 limit + 1 条，摘录由命中位置直接截取
+    hits = search_posts(q, limit + 1, filters, cursor_key(cursor))
+    page = hits[:limit]
     results = []
-    all_posts = get_all_posts()
-
-    for post in all_posts:
-        # 构建可搜索内容
-        title_lower = post["title"].lower()
-        summary_lower = post["summary"].lower()
-        tags_lower = " ".join(post["tags"]).lower()
-        category_lower = post["category"].lower()
-        content_lower = clean_html(post["content"]).lower()
-
-        searchable = f"{title_lower} {summary_lower} {tags_lower} {category_lower} {content_lower}"
-
-        # 计算相关性分数
-        score = 0
-
-        # 标题匹配权重最高
-        if q_lower in title_lower:
-            score += 100
-            # 完全匹配额外加分
-            if q_lower == title_lower:
-                score += 50
-
-        # 摘要匹配
-        if q_lower in summary_lower:
-            score += 50
-
-        # 标签匹配
-        if q_lower in tags_lower:
-            score += 40
-
-        # 分类匹配
-        if q_lower in category_lower:
-            score += 30
-
-        # 内容匹配
-        if q_lower in content_lower:
-            score += 20
-
-        # 计算出现次数
-        score += searchable.count(q_lower) * 5
-
-        if score > 0:
-            # 提取匹配上下文用于高亮
-            match_context = extract_match_context(clean_html(post["content"]), q, 150)
-
-            results.append({
-                "slug": post["slug"],
-                "title": post["title"],
-                "date_str": post["date_str"],
-                "summary": post["summary"],
-                "tags": post["tags"],
-                "category": post["category"],
-                "score": score,
-                "match_context": match_context,
-            })
-
-    # 按相关性排序
-    results.sort(key=lambda x: x["score"], reverse=True)
-    # 限制结果数量
-    results = results[:20]
-
-    return jsonify(results)
-
-
-def extract_match_context(content: str, query: str, max_length: int = 150) -> str:
-    """提取包含搜索词的上下文片段"""
-    if not content:
-        return ""
-
-    query_lower = query.lower()
-    content_lower = content.lower()
-
-    # 查找第一个匹配位置
-    match_pos = content_lower.find(query_lower)
-    if match_pos == -1:
-        return content[:max_length]
-
-    # 计算上下文范围
-    start = max(0, match_pos - max_length // 2)
-    end = min(len(content), match_pos + max_length + len(query))
-
-    context = content[start:end]
+    for score, meta in page:
+        match_context, match_html = search_snippets(meta, q)
+
+        results.append({
+            "slug": meta["slug"],
+            "title": meta["title"],
+            "date_str": meta["date_str"],
+            "summary": meta["summary"],
+            "tags": meta["tags"],
+            "category": meta["category"],
+            "score": score,
+            "match_context": match_context,
+            "match_html": match_html,
+        })
+
+    next_cursor = cursor_for(page[-1]) if len(hits) > limit else None
+    return jsonify({"results": results, "next_cursor": next_cursor})
+
+
+@app.route("/blog/search/suggest")
+def search_suggest():
+    """搜索框自动补全：只按标题 / 标签前缀匹配，返回精简字段"""
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify([])
+    return jsonify([
+        {"slug": meta["slug"], "title": meta["title"], "category": meta["category"]}
+        for meta in suggest_posts(q)
+    ])
 
-    # 添加省略号
-    if start > 0:
-        context = "..." + context
-    if end < len(content):
-        context = context + "..."
 
-    return context.strip()
+def search_with_fts(q: str, limit: int = 20, offset: int = 0, filters: dict = None) -> list:
+    """FTS5 检索：BM25 排序，片段与高亮由 SQLite 生成；文章信息优先取内存语料"""
+    hits = search_fts(q, limit, offset, filters)
+    rows = {p.id: p for p in Post.query.filter(Post.id.in_([h["post_id"] for h in hits])).all()}
+    results = []
+    for hit in hits:
+        row = rows.get(hit["post_id"])
+        if row is None:
+            continue
+        meta = corpus.get(row.slug)
+        if meta is None:
+            meta = {
+                "title": row.title,
+                "date_str": row.date.strftime("%Y年%m月%d日") if row.date else "未知日期",
+                "summary": row.summary or "",
+                "tags": [t.name for t in row.tags],
+                "category": row.category,
+            }
+        results.append({
+            "slug": row.slug,
+            "title": meta["title"],
+            "date_str": meta["date_str"],
+            "summary": meta["summary"],
+            "tags": meta["tags"],
+            "category": meta["category"],
+            "score": hit["score"],
+            "match_context": hit["snippet"],
+            "match_html": hit["snippet_html"],
+        })
+    return results
 
 
 # ── 工具函数 ──────────────────────────────────────────────────────────────────
 
-def clean_html(text: str) -> str:
-    return re.sub(r"<[^>]+>", "", text or "").strip()
+def get_page_arg() -> int:
+    """读取 ?page= 参数，非法值按第 1 页处理"""
+    return request.args.get("page", 1, type=int) or 1
+
+
+def get_search_filters() -> dict:
+    """读取搜索过滤参数；to 当天包含在内，日期格式非法时忽略该条件"""
+    filters = {}
+    for key in ("category", "tag"):
+        value = request.args.get(key, "").strip()
+        if value:
+            filters[key] = value
+    for arg, key, shift in (("from", "date_from", 0), ("to", "date_to", 1)):
+        value = request.args.get(arg, "").strip()
+        if value:
+            try:
+                filters[key] = datetime.strptime(value, "%Y-%m-%d") + timedelta(days=shift)
+            except ValueError:
+                pass
+    return filters
 
 
 def get_client_ip() -> str:
     return request.headers.get("X-Forwarded-For", request.remote_addr).split(",")[0].strip()
 
 
+def is_prefetch() -> bool:
+    """浏览器预取 / 预渲染请求（Sec-Purpose、Purpose、X-Moz 头）"""
+    purpose = " ".join(request.headers.get(h, "") for h in ("Sec-Purpose", "Purpose", "X-Moz"))
+    return "prefetch" in purpose.lower() or "prerender" in purpose.lower()
+
+
 # ── 登录 / 登出 ───────────────────────────────────────────────────────────────
 
 @app.route("/admin/login", methods=["GET", "POST"])
@@ -478,6 +445,8 @@ def admin_new():
 
         with open(filepath, "w", encoding="utf-8") as f:
             f.write(front_matter + content)
+        corpus.update_file(filepath)
+        post_files_changed()
 
         flash(f"文章已创建：{category}/{filename}")
         return redirect(url_for("admin_index"))
@@ -498,6 +467,8 @@ def admin_edit(slug: str):
         content = request.form.get("content", "")
         with open(filepath, "w", encoding="utf-8") as f:
             f.write(content)
+        corpus.update_file(filepath)
+        post_files_changed()
         flash("文章已保存")
         return redirect(url_for("admin_edit", slug=slug))
 
@@ -514,6 +485,8 @@ def admin_delete(slug: str):
     filepath = os.path.join(POSTS_DIR, slug + ".md")
     if os.path.exists(filepath):
         os.remove(filepath)
+        corpus.discard(filepath)
+        post_files_changed()
         flash(f"文章 {slug} 已删除")
     return redirect(url_for("admin_index"))
 
@@ -541,6 +514,8 @@ def admin_upload():
     os.makedirs(category_dir, exist_ok=True)
     filepath = os.path.join(category_dir, filename)
     file.save(filepath)
+    corpus.update_file(filepath)
+    post_files_changed()
     flash(f"文件已上传：{category}/{filename}")
     return redirect(url_for("admin_index"))
 
@@ -583,28 +558,64 @@ def admin_database():
     tag_count = Tag.query.count()
     category_count = len(get_all_categories())
 
-    # 阅读量排行
+    # 阅读量排行（先写出缓冲中的阅读记录）
+    view_buffer.flush()
     top_posts = Post.query.order_by(Post.views.desc()).limit(10).all()
+    # 近 7 天排行读按天汇总表（由 rollup_views.py 定时生成）
+    recent_top = top_posts_since(7)
 
     return render_template("admin/database.html",
                          post_count=post_count,
                          tag_count=tag_count,
                          category_count=category_count,
-                         top_posts=top_posts)
+                         top_posts=top_posts,
+                         recent_top=recent_top)
+
+
+@app.route("/admin/analytics")
+@login_required
+def admin_analytics():
+    """
+    阅读趋势 JSON：group = post / category / tag，interval = day / week，
+    days（默认 30，最多 365）、limit（默认 10，最多 100），可按 category / tag / slug 过滤
+    """
+    group = request.args.get("group", "post")
+    interval = request.args.get("interval", "day")
+    if group not in SERIES_GROUPS or interval not in SERIES_INTERVALS:
+        return jsonify({"error": f"group 可选 {'/'.join(SERIES_GROUPS)}，interval 可选 {'/'.join(SERIES_INTERVALS)}"}), 400
+    days = min(max(request.args.get("days", 30, type=int) or 30, 1), 365)
+    limit = min(max(request.args.get("limit", 10, type=int) or 10, 1), 100)
+    filters = {key: request.args.get(key, "").strip() for key in ("category", "tag", "slug")}
+    return jsonify(view_series(group, interval, days, limit, filters))
+
+
+def run_sync_job(job):
+    """后台任务：同步文章到数据库，进度写入任务状态"""
+    with app.app_context():
+        # 在 gunicorn worker 的后台线程中运行，不在服务进程里再开渲染进程池
+        stats = sync_posts_from_files(POSTS_DIR, workers=1, progress=job.update)
+        db_posts.clear_cache()
+        return stats
 
 
 @app.route("/admin/database/sync", methods=["POST"])
 @login_required
 def admin_database_sync():
-    """手动同步文章到数据库"""
-    try:
-        sync_posts_from_files(POSTS_DIR)
-        flash("文章同步成功！")
-    except Exception as e:
-        flash(f"同步失败：{str(e)}")
+    """在后台同步文章到数据库；同步已在进行时不重复启动。页面通过 /admin/jobs/sync 轮询进度"""
+    job, started = job_runner.start("sync", run_sync_job)
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify({"started": started, "job": job}), 202 if started else 409
+    flash("已在后台开始同步文章" if started else "同步正在进行中，请稍候")
     return redirect(url_for("admin_database"))
 
 
+@app.route("/admin/jobs/<name>")
+@login_required
+def admin_job_status(name: str):
+    """后台任务状态：status、progress、elapsed（秒）、result / error；从未运行过时 status 为 idle"""
+    return jsonify(job_runner.status(name) or {"name": name, "status": "idle"})
+
+
 # ── 在线终端 ──────────────────────────────────────────────────────────────────
 
 # 白名单：只允许以下命令前缀
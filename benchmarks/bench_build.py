@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+语料构建基准：对比串行与进程池并行解析的耗时
+
+用法:
+  python benchmarks/bench_build.py --posts 3000
+  python benchmarks/bench_build.py --posts 3000 --workers 2 4 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+BLOG_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BLOG_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synth import generate_corpus
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="串行 / 并行语料构建耗时对比")
+    parser.add_argument("--posts", type=int, default=3000, help="合成文章数")
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count() or 1],
+                        help="并行进程数，可给多个值")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        posts_dir = os.path.join(tmp, "posts")
+        # 必须在导入 corpus 之前设置：指向合成语料并关闭渲染缓存，保证每轮都真实渲染
+        os.environ["BLOG_POSTS_DIR"] = posts_dir
+        os.environ["BLOG_RENDER_CACHE"] = "off"
+        from corpus import parse_many, parse_post, parse_post_meta
+
+        print(f"生成 {args.posts} 篇合成文章...")
+        paths = sorted(generate_corpus(posts_dir, args.posts, seed=args.seed))
+
+        print(f"{'模式':<16}{'进程数':>8}{'耗时(s)':>12}{'加速比':>10}")
+        for label, parser_fn in (("完整渲染", parse_post), ("仅元数据", parse_post_meta)):
+            serial_time, baseline = timed(parse_many, paths, parser_fn, workers=1)
+            print(f"{label:<14}{1:>8}{serial_time:>12.2f}{1.0:>10.2f}")
+            for workers in args.workers:
+                if workers <= 1:
+                    continue
+                par_time, result = timed(parse_many, paths, parser_fn, workers=workers, threshold=0)
+                # 并行结果必须与串行完全一致（顺序与内容）
+                assert result == baseline, "并行解析结果与串行不一致"
+                print(f"{label:<14}{workers:>8}{par_time:>12.2f}{serial_time / par_time:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+站内搜索基准：在合成语料上回放固定查询日志，对比各搜索后端的延迟、内存与召回率
+
+后端:
+  index  内存倒排索引（/blog/search 默认后端，search_index.search_posts）
+  fts    SQLite FTS5 + BM25（database.search_fts）
+  like   数据库 LIKE 回退（database.search_in_db(use_fts=False)）
+
+标注集：对每条查询，正文 / 标题 / 摘要 / 标签 / 分类的纯文本中包含该查询（忽略大小写、
+连续空白视为一个空格）的文章即为相关文章，由暴力扫描得到
+  recall   返回全部结果时覆盖到的相关文章比例（各查询平均，无相关文章的查询不计）
+  p@10     前 10 条中相关文章的比例
+
+用法:
+  python benchmarks/bench_search.py --posts 1000
+  python benchmarks/bench_search.py --posts 1000 10000 50000 --backends index fts
+  python benchmarks/bench_search.py --posts 1000 --json result.json --min-recall 0.95   # CI
+
+全程离线：语料由 synth.py 按 seed 生成，数据库为临时 SQLite 文件
+每个语料规模在独立子进程中运行（各模块在导入时读取环境变量，且内存互不干扰）
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BLOG_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BLOG_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_QUERIES = os.path.join(BENCH_DIR, "queries.txt")
+BACKENDS = ("index", "fts", "like")
+PAGE_SIZE = 20
+TOP_N = 10
+UNLIMITED = 10 ** 9
+
+
+def load_queries(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+def rss_mb() -> float:
+    """当前进程常驻内存（MB）；非 Linux 退回到峰值 RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# ── 单个语料规模（子进程内执行）───────────────────────────────────────────────
+
+def build_labels(posts: list, queries: list, load_text) -> dict:
+    """查询 -> 相关文章 slug 集合（子串包含即相关）"""
+    docs = {}
+    for meta in posts:
+        fields = [meta["title"], meta["summary"], " ".join(str(t) for t in meta["tags"]),
+                  meta["category"], load_text(meta)]
+        docs[meta["slug"]] = _normalize(" ".join(str(f) for f in fields))
+    return {q: {slug for slug, text in docs.items() if _normalize(q) in text} for q in queries}
+
+
+def measure(search, queries: list, labels: dict, repeat: int) -> dict:
+    """search(query, limit) -> slug 列表"""
+    latencies = []
+    for _ in range(repeat):
+        for q in queries:
+            start = time.perf_counter()
+            search(q, PAGE_SIZE)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    recalls, precisions = [], []
+    for q in queries:
+        relevant = labels[q]
+        if not relevant:
+            continue
+        found = search(q, UNLIMITED)
+        recalls.append(len(relevant.intersection(found)) / len(relevant))
+        top = found[:TOP_N]
+        precisions.append(sum(1 for s in top if s in relevant) / len(top) if top else 0.0)
+
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "recall": sum(recalls) / len(recalls) if recalls else 1.0,
+        "p_at_10": sum(precisions) / len(precisions) if precisions else 1.0,
+    }
+
+
+def run_size(n_posts: int, backends: list, queries: list, repeat: int, seed: int) -> dict:
+    # 合成语料、渲染缓存与数据库在结束后一并删除（--posts 50000 时有数百 MB）
+    with tempfile.TemporaryDirectory(prefix="bench-search-") as tmp:
+        return _run_size(tmp, n_posts, backends, queries, repeat, seed)
+
+
+def _run_size(tmp: str, n_posts: int, backends: list, queries: list, repeat: int, seed: int) -> dict:
+    posts_dir = os.path.join(tmp, "posts")
+    # 必须在导入博客模块之前设置
+    os.environ.update({
+        "BLOG_POSTS_DIR": posts_dir,
+        "BLOG_RENDER_CACHE": os.path.join(tmp, "render.db"),
+        "BLOG_SEARCH_CACHE_SIZE": "0",      # 测的是后端本身，关闭结果缓存
+        "BLOG_WATCH": "off",
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+    })
+
+    from synth import generate_corpus
+    generate_corpus(posts_dir, n_posts, seed=seed)
+
+    from corpus import corpus
+    from search_index import search_posts, _load_text
+    corpus.refresh(workers=None)
+    posts = corpus.listing()
+    # 标注时渲染全部文章，之后各后端建索引都命中渲染缓存
+    labels = build_labels(posts, queries, _load_text)
+
+    report = {"posts": len(posts), "queries": len(queries),
+              "labelled": sum(1 for q in queries if labels[q]), "backends": {}}
+
+    if "index" in backends:
+        rss = rss_mb()
+        start = time.perf_counter()
+        search_posts("warmup")
+        build = time.perf_counter() - start
+        result = measure(lambda q, limit: [m["slug"] for _, m in search_posts(q, limit)],
+                         queries, labels, repeat)
+        result.update(build_s=build, memory_mb=rss_mb() - rss)
+        report["backends"]["index"] = result
+
+    db_backends = [b for b in backends if b in ("fts", "like")]
+    if db_backends:
+        from flask import Flask
+        from models import Post
+        from database import init_database, sync_posts_from_files, search_fts, search_in_db, fts_available
+
+        app = Flask(__name__)
+        init_database(app)
+        with app.app_context():
+            rss = rss_mb()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                sync_posts_from_files(posts_dir, workers=1)
+            build = time.perf_counter() - start
+            db_memory = rss_mb() - rss
+            db_size = os.path.getsize(os.path.join(tmp, "bench.db")) / 2 ** 20
+            slugs = dict(Post.query.with_entities(Post.id, Post.slug).all())
+
+            if "fts" in db_backends and fts_available():
+                result = measure(lambda q, limit: [slugs[h["post_id"]] for h in search_fts(q, limit)],
+                                 queries, labels, repeat)
+                result.update(build_s=build, memory_mb=db_memory, db_mb=db_size)
+                report["backends"]["fts"] = result
+            if "like" in db_backends:
+                result = measure(lambda q, limit: [p.slug for p in search_in_db(q, limit, use_fts=False)],
+                                 queries, labels, repeat)
+                result.update(build_s=build, memory_mb=db_memory, db_mb=db_size)
+                report["backends"]["like"] = result
+
+    return report
+
+
+# ── 汇总 ─────────────────────────────────────────────────────────────────────
+
+def print_report(report: dict):
+    print(f"\n语料 {report['posts']} 篇，查询 {report['queries']} 条（有相关文章 {report['labelled']} 条）")
+    print(f"{'后端':<8}{'建索引(s)':>11}{'内存(MB)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'召回率':>9}{'P@10':>8}")
+    for name, r in report["backends"].items():
+        print(f"{name:<10}{r['build_s']:>11.2f}{r['memory_mb']:>10.1f}{r['p50_ms']:>10.2f}"
+              f"{r['p95_ms']:>10.2f}{r['recall']:>10.3f}{r['p_at_10']:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="搜索后端延迟 / 内存 / 召回率基准")
+    parser.add_argument("--posts", type=int, nargs="+", default=[1000], help="语料规模，可给多个值")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--queries", default=DEFAULT_QUERIES, help="查询日志文件")
+    parser.add_argument("--repeat", type=int, default=5, help="延迟测量时回放查询日志的次数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="把结果写入 JSON 文件（CI 归档 / 对比）")
+    parser.add_argument("--min-recall", type=float, default=None,
+                        help="任一后端平均召回率低于该值时以非零状态退出")
+    parser.add_argument("--run-one", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+
+    if args.run_one is not None:
+        report = run_size(args.run_one, args.backends, queries, args.repeat, args.seed)
+        print(json.dumps(report, ensure_ascii=False))
+        return
+
+    reports = []
+    for n in args.posts:
+        cmd = [sys.executable, os.path.abspath(__file__), "--run-one", str(n),
+               "--backends", *args.backends, "--queries", args.queries,
+               "--repeat", str(args.repeat), "--seed", str(args.seed)]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            sys.stderr.write(proc.stderr)
+            sys.exit(proc.returncode)
+        report = json.loads(proc.stdout.strip().splitlines()[-1])
+        print_report(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+
+    if args.min_recall is not None:
+        failed = [(r["posts"], name, b["recall"]) for r in reports
+                  for name, b in r["backends"].items() if b["recall"] < args.min_recall]
+        for posts, name, recall in failed:
+            print(f"✗ {name} @ {posts} 篇：召回率 {recall:.3f} < {args.min_recall}")
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
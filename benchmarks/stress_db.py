@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+数据库并发压力测试：多个进程同时读文章、写阅读量并反复全量同步，统计各角色吞吐、延迟与错误
+（"database is locked" 等），用于验证 database.py 中的连接参数（BLOG_DB_PROFILE）
+
+角色（各自独立进程，模拟多个 gunicorn worker 与爬虫同步脚本）:
+  reader   列表分页 + 文章详情 + 分类 / 标签统计（db_posts，与 BLOG_SERVE_FROM=db 的请求相同）
+  writer   阅读量缓冲批量落库（view_buffer.ViewBuffer.flush）
+  sync     sync_posts_from_files(full=True)，每轮在一个事务中重写全部文章
+
+用法:
+  python benchmarks/stress_db.py --posts 500 --seconds 15
+  python benchmarks/stress_db.py --posts 500 --seconds 15 --profile off     # 对比 SQLAlchemy 默认参数
+  python benchmarks/stress_db.py --posts 500 --max-errors 0                 # CI：出现错误时非零退出
+  DATABASE_URL=mysql+pymysql://... python benchmarks/stress_db.py --keep-db  # 指定数据库（会写入测试数据）
+
+全程离线：语料由 synth.py 按 seed 生成，未指定 DATABASE_URL 时使用临时 SQLite 文件
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import contextlib
+import multiprocessing
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BLOG_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BLOG_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+ROLES = ("reader", "writer", "sync")
+PER_PAGE = 20
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_app():
+    from flask import Flask
+    from database import init_database
+    app = Flask(__name__)
+    init_database(app)
+    return app
+
+
+# ── 各角色（子进程内执行）─────────────────────────────────────────────────────
+
+def run_reader(app, deadline: float, rng: random.Random, stats: dict):
+    import db_posts
+    from models import db, Post
+
+    with app.app_context():
+        slugs = [s for (s,) in db.session.query(Post.slug).all()]
+        categories = list(db_posts.get_aggregates()["categories"])
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            with app.app_context():
+                page = db_posts.get_listing_page(rng.choice(categories), page=rng.randint(1, 5),
+                                                 per_page=PER_PAGE)
+                post = db_posts.get_post(rng.choice(slugs))
+                if post:
+                    db_posts.get_neighbours(post)
+                db_posts.clear_cache()
+                db_posts.get_aggregates()
+                assert page["items"] is not None
+        except Exception as e:
+            stats["errors"].append(f"{type(e).__name__}: {e}".splitlines()[0])
+            continue
+        stats["latencies"].append((time.perf_counter() - start) * 1000)
+
+
+def run_writer(app, deadline: float, rng: random.Random, stats: dict, batch: int):
+    from models import db, Post
+    from view_buffer import ViewBuffer
+
+    with app.app_context():
+        post_ids = [i for (i,) in db.session.query(Post.id).all()]
+    # 不启动后台线程，由本循环控制落库时机
+    buffer = ViewBuffer(flush_interval=3600, flush_size=10 ** 9)
+    buffer.init_app(app)
+    buffer._thread = True
+    while time.monotonic() < deadline:
+        for _ in range(batch):
+            buffer.record(rng.choice(post_ids), "10.0.0.%d" % rng.randint(1, 254), "stress")
+        start = time.perf_counter()
+        written = buffer.flush()
+        if written == 0:
+            stats["errors"].append("flush failed（记录留在缓冲中重试）")
+            continue
+        stats["latencies"].append((time.perf_counter() - start) * 1000)
+        stats["written"] = stats.get("written", 0) + written
+    # 收尾：把失败后留在缓冲中的记录写完，便于核对总数
+    for _ in range(10):
+        if buffer.flush() or not buffer._counts:
+            break
+    stats["written"] = stats.get("written", 0)
+    stats["unflushed"] = sum(buffer._counts.values())
+
+
+def run_sync(app, deadline: float, rng: random.Random, stats: dict, posts_dir: str):
+    from models import db
+    from database import sync_posts_from_files
+
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            with app.app_context(), contextlib.redirect_stdout(open(os.devnull, "w")):
+                sync_posts_from_files(posts_dir, workers=1, full=True)
+        except Exception as e:
+            stats["errors"].append(f"{type(e).__name__}: {e}".splitlines()[0])
+            with app.app_context():
+                db.session.rollback()
+            continue
+        stats["latencies"].append((time.perf_counter() - start) * 1000)
+
+
+def worker(role: str, index: int, env: dict, start_at: float, seconds: float, args, queue):
+    os.environ.update(env)
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    rng = random.Random(index)
+    stats = {"role": role, "latencies": [], "errors": []}
+    # 所有进程初始化完成后同时开始
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.monotonic() + seconds
+    if role == "reader":
+        run_reader(app, deadline, rng, stats)
+    elif role == "writer":
+        run_writer(app, deadline, rng, stats, args.batch)
+    else:
+        run_sync(app, deadline, rng, stats, env["BLOG_POSTS_DIR"])
+    queue.put(stats)
+
+
+# ── 汇总 ─────────────────────────────────────────────────────────────────────
+
+def summarize(results: list) -> dict:
+    report = {}
+    for role in ROLES:
+        rs = [r for r in results if r["role"] == role]
+        if not rs:
+            continue
+        latencies = [x for r in rs for x in r["latencies"]]
+        errors = [e for r in rs for e in r["errors"]]
+        report[role] = {
+            "processes": len(rs),
+            "ops": len(latencies),
+            "errors": len(errors),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "max_ms": max(latencies) if latencies else 0.0,
+            "sample_errors": sorted(set(errors))[:3],
+            "written": sum(r.get("written", 0) for r in rs),
+            "unflushed": sum(r.get("unflushed", 0) for r in rs),
+        }
+    return report
+
+
+def print_report(report: dict, seconds: float):
+    print(f"{'角色':<8}{'进程':>6}{'操作数':>9}{'ops/s':>9}{'错误':>7}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}")
+    for role, r in report.items():
+        print(f"{role:<10}{r['processes']:>6}{r['ops']:>9}{r['ops'] / seconds:>9.1f}{r['errors']:>7}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['max_ms']:>10.1f}")
+        for e in r["sample_errors"]:
+            print(f"    ✗ {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库并发读写压力测试")
+    parser.add_argument("--posts", type=int, default=500, help="合成语料规模")
+    parser.add_argument("--seconds", type=float, default=15, help="压测时长")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--syncs", type=int, default=1, help="同时运行的全量同步进程数")
+    parser.add_argument("--batch", type=int, default=50, help="每次阅读量落库的记录数")
+    parser.add_argument("--profile", choices=("on", "off"), default="on", help="BLOG_DB_PROFILE")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep-db", action="store_true",
+                        help="使用已设置的 DATABASE_URL（不创建临时库），并保留临时语料目录")
+    parser.add_argument("--max-errors", type=int, default=None, help="错误总数超过该值时以非零状态退出")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="stress-db-")
+    try:
+        run(args, tmp)
+    finally:
+        if args.keep_db:
+            print(f"保留临时目录 {tmp}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run(args, tmp: str):
+    posts_dir = os.path.join(tmp, "posts")
+    env = {
+        "BLOG_POSTS_DIR": posts_dir,
+        "BLOG_RENDER_CACHE": os.path.join(tmp, "render.db"),
+        "BLOG_WATCH": "off",
+        "BLOG_DB_PROFILE": args.profile,
+        "BLOG_DB_CACHE_TTL": "0",
+    }
+    if not args.keep_db or not os.environ.get("DATABASE_URL"):
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'stress.db')}"
+    os.environ.update(env)
+    env["DATABASE_URL"] = os.environ["DATABASE_URL"]
+
+    from synth import generate_corpus
+    from models import db, Post, ViewLog
+    from database import sync_posts_from_files
+
+    generate_corpus(posts_dir, args.posts, seed=args.seed)
+    app = make_app()
+    with app.app_context(), contextlib.redirect_stdout(open(os.devnull, "w")):
+        sync_posts_from_files(posts_dir, workers=1)
+    with app.app_context():
+        views_before = db.session.query(db.func.coalesce(db.func.sum(Post.views), 0)).scalar()
+        logs_before = ViewLog.query.count()
+
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    roles = ["reader"] * args.readers + ["writer"] * args.writers + ["sync"] * args.syncs
+    start_at = time.time() + 3 + 0.3 * len(roles)
+    procs = [ctx.Process(target=worker, args=(role, i, env, start_at, args.seconds, args, queue))
+             for i, role in enumerate(roles)]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    report = summarize(results)
+    print(f"\n{env['DATABASE_URL'].split('://')[0]}，BLOG_DB_PROFILE={args.profile}，"
+          f"{args.posts} 篇文章，{args.seconds:g} 秒")
+    print_report(report, args.seconds)
+
+    # 核对：落库成功的阅读次数应与数据库增量完全一致
+    with app.app_context():
+        views_after = db.session.query(db.func.coalesce(db.func.sum(Post.views), 0)).scalar()
+        logs_after = ViewLog.query.count()
+    written = report.get("writer", {}).get("written", 0)
+    consistent = views_after - views_before == written and logs_after - logs_before == written
+    print(f"阅读量落库 {written} 次，数据库增量 views={views_after - views_before} "
+          f"view_logs={logs_after - logs_before}，未落库 {report.get('writer', {}).get('unflushed', 0)} "
+          f"{'✓' if consistent else '✗ 不一致'}")
+
+    total_errors = sum(r["errors"] for r in report.values())
+    if not consistent or (args.max_errors is not None and total_errors > args.max_errors):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
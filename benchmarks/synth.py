@@ -0,0 +1,142 @@
+"""
+合成测试语料
+按 crawlers/fetch_news.py 中 generate_markdown 的格式批量生成中英混合简报，供基准测试使用
+同一 seed 生成的语料完全相同，可离线、可重复
+"""
+
+import os
+import json
+import random
+import datetime
+
+BLOG_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CRAWLERS_DIR = os.path.join(BLOG_ROOT, "crawlers")
+
+# 各分类的中英文词表：每个分类有自己的专属词，另外共享一批通用词
+ZH_WORDS = {
+    "ai":      ["大模型", "人工智能", "推理", "训练", "芯片", "算力", "智能体", "开源", "多模态", "机器人"],
+    "finance": ["股市", "央行", "利率", "基金", "债券", "汇率", "通胀", "加密货币", "财报", "上市"],
+    "sports":  ["足球", "篮球", "中超", "联赛", "冠军", "转会", "球员", "教练", "决赛", "积分榜"],
+    "hr":      ["招聘", "薪酬", "裁员", "劳动法", "人才", "绩效", "远程办公", "组织", "培训", "福利"],
+}
+EN_WORDS = {
+    "ai":      ["model", "inference", "training", "GPU", "agent", "OpenAI", "benchmark", "transformer", "robotics", "dataset"],
+    "finance": ["stocks", "Fed", "rates", "bonds", "inflation", "earnings", "IPO", "crypto", "markets", "yield"],
+    "sports":  ["football", "NBA", "league", "transfer", "coach", "playoffs", "final", "striker", "season", "title"],
+    "hr":      ["hiring", "layoffs", "salary", "workforce", "remote", "talent", "benefits", "policy", "culture", "union"],
+}
+ZH_COMMON = ["发布", "宣布", "最新", "全球", "市场", "增长", "报告", "计划", "公司", "投资", "政策", "数据"]
+EN_COMMON = ["new", "report", "launch", "global", "growth", "company", "plan", "deal", "data", "update", "week", "record"]
+
+CODE_SNIPPETS = [
+    ("python", "import torch\n\nmodel = torch.nn.Linear(128, 10)\nprint(model)"),
+    ("python", "def fib(n):\n    a, b = 0, 1\n    for _ in range(n):\n        a, b = b, a + b\n    return a"),
+    ("bash", "pip install -r requirements.txt\npython app.py"),
+    ("sql", "SELECT category, COUNT(*) FROM posts GROUP BY category;"),
+]
+
+
+def load_configs() -> dict:
+    """读取各分类爬虫配置中的标题、标签等字段"""
+    configs = {}
+    for category in sorted(ZH_WORDS):
+        path = os.path.join(CRAWLERS_DIR, category, f"{category}_config.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                configs[category] = json.load(f)
+        except (OSError, ValueError):
+            configs[category] = {}
+    return configs
+
+
+def _sentence(rng: random.Random, words: list, common: list, n: int, sep: str) -> str:
+    return sep.join(rng.choice(words if rng.random() < 0.6 else common) for _ in range(n))
+
+
+def generate_markdown(rng: random.Random, category: str, config: dict,
+                      date: datetime.datetime, n_articles: int, with_code: bool) -> str:
+    """与 fetch_news.generate_markdown 输出格式一致的简报"""
+    date_str = date.strftime("%Y-%m-%d %H:%M")
+    date_zh  = date.strftime("%Y年%m月%d日 %H:%M")
+
+    title_zh = config.get("title_zh", f"{category} 资讯简报")
+    title_en = config.get("title_en", f"{category.capitalize()} News Digest")
+    tags     = config.get("tags", [category, "简报"])
+    summary  = config.get("summary_tpl", "{date_zh} {title_zh}汇总").format(
+                   date_zh=date_zh, title_zh=title_zh)
+
+    zh_words, en_words = ZH_WORDS[category], EN_WORDS[category]
+    n_zh = n_articles // 2
+    lines = [
+        f"---",
+        f"title: {title_zh} | {title_en} {date_str}",
+        f"date: {date_str}",
+        f"tags: {tags}",
+        f"summary: {summary}",
+        f"---",
+        f"",
+        f"# {title_zh} | {title_en}",
+        f"",
+        f"> 日期: {date_zh} | 自动抓取自 {rng.randint(3, 8)} 个来源，共 {n_articles} 条资讯",
+        f"",
+        f"---",
+        f"",
+        f"## 国内资讯",
+        f"",
+    ]
+    for i in range(1, n_zh + 1):
+        lines += [
+            f"### {i}. {_sentence(rng, zh_words, ZH_COMMON, 6, '')}",
+            f"",
+            f"- **来源**: 示例来源{rng.randint(1, 9)}",
+            f"- **链接**: [https://example.com/zh/{i}](https://example.com/zh/{i})",
+            f"- **摘要**: {_sentence(rng, zh_words, ZH_COMMON, 30, '')}...",
+            f"",
+        ]
+    lines += [f"## International News", f""]
+    for i in range(1, n_articles - n_zh + 1):
+        lines += [
+            f"### {i}. {_sentence(rng, en_words, EN_COMMON, 7, ' ').capitalize()}",
+            f"",
+            f"- **Source**: Example Source {rng.randint(1, 9)}",
+            f"- **Link**: [https://example.com/en/{i}](https://example.com/en/{i})",
+            f"- **Summary**: {_sentence(rng, en_words, EN_COMMON, 25, ' ')}...",
+            f"",
+        ]
+    if with_code:
+        lang, code = rng.choice(CODE_SNIPPETS)
+        lines += [f"```{lang}", code, f"```", f""]
+    lines += [
+        f"---",
+        f"",
+        f"*本简报由自动脚本生成 | Auto-generated by fetch_news.py*",
+    ]
+    return "\n".join(lines)
+
+
+def generate_corpus(root: str, n_posts: int, seed: int = 42, code_ratio: float = 0.2) -> list:
+    """
+    在 root 下生成 n_posts 篇简报（posts/<分类>/YYYY-MM-DD-HHMM-<slug>.md 结构）
+    返回生成的文件路径列表
+    """
+    rng = random.Random(seed)
+    configs = load_configs()
+    categories = sorted(ZH_WORDS)
+    start = datetime.datetime(2024, 1, 1, 8, 0)
+    paths = []
+    for i in range(n_posts):
+        category = categories[i % len(categories)]
+        config = configs[category]
+        # 每个分类每天约 4 篇，时间递增且不重复
+        date = start + datetime.timedelta(hours=6 * (i // len(categories)), minutes=i % len(categories))
+        slug_name = config.get("slug", f"{category}-news-digest")
+        category_dir = os.path.join(root, category)
+        os.makedirs(category_dir, exist_ok=True)
+        path = os.path.join(category_dir, f"{date.strftime('%Y-%m-%d-%H%M')}-{slug_name}.md")
+        content = generate_markdown(rng, category, config, date,
+                                    n_articles=rng.randint(6, 14),
+                                    with_code=rng.random() < code_ratio)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        paths.append(path)
+    return paths
@@ -0,0 +1,523 @@
+"""
+文章语料库
+负责解析 posts/ 下的 Markdown 文件，并在进程内缓存解析结果
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import yaml
+
+from render_cache import render_cache, make_key
+from markdown_pool import MarkdownPool
+
+POSTS_DIR = os.environ.get("BLOG_POSTS_DIR") or os.path.join(os.path.dirname(__file__), "posts")
+
+MD_EXTENSIONS = ["fenced_code", "tables", "toc", "codehilite", "nl2br"]
+MD_EXTENSION_CONFIGS = {"codehilite": {"linenums": False}}
+
+# 复用预配置的转换器，避免每次渲染都重新初始化扩展
+_md_pool = MarkdownPool(MD_EXTENSIONS, MD_EXTENSION_CONFIGS)
+
+# 命令行批量解析（数据库同步、静态导出）使用的进程数，1 表示串行
+# 服务进程中的 refresh 总是串行：不在多线程的 web worker 里 fork 进程池
+BUILD_WORKERS = int(os.environ.get("BLOG_BUILD_WORKERS", "0")) or (os.cpu_count() or 1)
+# 待解析文件少于该数量时直接串行，进程池的启动开销不划算
+PARALLEL_THRESHOLD = 200
+
+# 内存中保留的完整渲染文章数（文章详情页 / 搜索使用）
+FULL_POST_CACHE_SIZE = int(os.environ.get("BLOG_FULL_POST_CACHE", "128"))
+
+
+# ── 解析 Markdown 文件 ────────────────────────────────────────────────────────
+
+# 有 libyaml 时使用 C 实现的 SafeLoader，front matter 解析快一个数量级
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_FM_RE = re.compile(r"^---\s*\n(.*?)\n---\s*\n", re.DOTALL)
+
+# 只解析元数据时读取的字符数，足以覆盖 front matter 与摘要所需的正文开头
+META_READ_CHARS = 4096
+SUMMARY_CHARS = 120
+
+
+def split_front_matter(raw: str) -> tuple[str | None, str]:
+    """拆分 front matter 与正文，返回 (front matter 文本, 正文)"""
+    fm_match = _FM_RE.match(raw)
+    if fm_match:
+        return fm_match.group(1), raw[fm_match.end():]
+    return None, raw
+
+
+def load_front_matter(fm_text: str | None) -> dict:
+    if not fm_text:
+        return {}
+    try:
+        return yaml.load(fm_text, Loader=_YAML_LOADER) or {}
+    except yaml.YAMLError:
+        return {}
+
+
+def build_meta(filepath: str, front_matter: dict, content: str) -> dict:
+    """由 front matter、文件名与正文开头构建文章元数据（列表页所需字段）"""
+    # slug 使用相对于 posts/ 的路径，例如 ai/2026-02-26-ai-news-digest
+    rel_path = os.path.relpath(filepath, POSTS_DIR)
+    slug = rel_path.replace("\\", "/").replace(".md", "")
+
+    # 分类（子目录名称），例如 ai、finance
+    parts = slug.split("/")
+    category = parts[0] if len(parts) > 1 else "general"
+
+    filename = os.path.basename(filepath)
+
+    date = front_matter.get("date")
+    if not date:
+        # 优先尝试带时分的格式：2026-03-08-1430-xxx.md
+        dt_match = re.match(r"(\d{4}-\d{2}-\d{2})-(\d{4})", filename)
+        if dt_match:
+            try:
+                date = datetime.strptime(dt_match.group(1) + dt_match.group(2), "%Y-%m-%d%H%M")
+            except ValueError:
+                date = None
+        else:
+            date_match = re.match(r"(\d{4}-\d{2}-\d{2})", filename)
+            if date_match:
+                try:
+                    date = datetime.strptime(date_match.group(1), "%Y-%m-%d").date()
+                except ValueError:
+                    date = None
+    if isinstance(date, str):
+        for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+            try:
+                date = datetime.strptime(date, fmt)
+                if fmt == "%Y-%m-%d":
+                    date = date.date()
+                break
+            except ValueError:
+                continue
+        else:
+            date = None
+
+    tags = front_matter.get("tags", [])
+    if isinstance(tags, str):
+        tags = [t.strip() for t in tags.split(",")]
+
+    return {
+        "slug": slug,
+        "category": category,
+        "filename": filename,
+        "filepath": filepath,
+        "title": front_matter.get("title", filename),
+        "date": date,
+        "date_str": (date.strftime("%Y年%m月%d日 %H:%M") if hasattr(date, 'hour') else date.strftime("%Y年%m月%d日")) if date else "未知日期",
+        "tags": tags,
+        "summary": front_matter.get("summary", content[:SUMMARY_CHARS].strip() + "..."),
+    }
+
+
+def parse_post_meta(filepath: str) -> dict | None:
+    """只解析元数据：读取文件开头的 front matter 与文件名日期，不渲染 Markdown"""
+    if not os.path.exists(filepath):
+        return None
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        head = f.read(META_READ_CHARS)
+        fm_match = _FM_RE.match(head)
+        if head.startswith("---") and not fm_match:
+            # front matter 超出预读范围，读完整个文件
+            head += f.read()
+        elif fm_match and len(head) - fm_match.end() < SUMMARY_CHARS:
+            head += f.read(SUMMARY_CHARS)
+
+    fm_text, content = split_front_matter(head)
+    return build_meta(filepath, load_front_matter(fm_text), content)
+
+
+def parse_post(filepath: str) -> dict | None:
+    """完整解析单篇文章（含正文 HTML、TOC），支持 posts/ 下任意子目录"""
+    if not os.path.exists(filepath):
+        return None
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        raw = f.read()
+
+    fm_text, content = split_front_matter(raw)
+
+    # 先查渲染缓存，命中时跳过 YAML 解析与 Markdown 渲染
+    cache_key = make_key(raw, MD_EXTENSIONS, MD_EXTENSION_CONFIGS) if render_cache else None
+    rendered = render_cache.get(cache_key) if render_cache else None
+    if rendered is None:
+        rendered = render_markdown(fm_text, content)
+        if render_cache:
+            render_cache.put(cache_key, rendered)
+
+    post = build_meta(filepath, rendered["front_matter"], content)
+    post.update({
+        "content": rendered["html"],
+        "toc": rendered["toc"],
+        "text": rendered["text"],
+        "raw": raw,
+    })
+    return post
+
+
+def render_markdown(fm_text: str | None, content: str) -> dict:
+    """解析 front matter 并渲染正文，结果可直接写入渲染缓存"""
+    front_matter = load_front_matter(fm_text)
+
+    with _md_pool.converter() as md:
+        html_content = md.convert(content)
+        toc = getattr(md, "toc", "")
+
+    return {
+        "front_matter": front_matter,
+        "html": html_content,
+        "toc": toc,
+        "text": clean_html(html_content),
+    }
+
+
+def clean_html(text: str) -> str:
+    return re.sub(r"<[^>]+>", "", text or "").strip()
+
+
+def parse_many(filepaths: list, parser=parse_post, workers: int = None,
+               chunksize: int = None, threshold: int = PARALLEL_THRESHOLD) -> list:
+    """
+    批量解析文件，返回与 filepaths 顺序一致的结果列表（解析失败为 None）
+    文件数达到 threshold 且 workers > 1 时分块交给进程池并行处理
+    """
+    workers = BUILD_WORKERS if workers is None else workers
+    if workers <= 1 or len(filepaths) < threshold:
+        return [parser(p) for p in filepaths]
+    chunksize = chunksize or max(1, len(filepaths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parser, filepaths, chunksize=chunksize))
+
+
+def post_sort_key(post: dict) -> datetime:
+    """文章排序键：date 统一转换为 datetime，缺失日期排在最后"""
+    d = post["date"]
+    if d is None:
+        return datetime.min
+    if isinstance(d, datetime):
+        return d
+    return datetime(d.year, d.month, d.day)
+
+
+# ── 进程级语料缓存 ────────────────────────────────────────────────────────────
+
+class PostCorpus:
+    """
+    已解析文章的进程内缓存
+    以文件路径为键，按 (mtime, size) 判断文件是否变化，只重新解析变化的文件
+    索引中只保存元数据；正文 HTML 在需要时渲染，并保留在有限大小的 LRU 中
+    """
+
+    def __init__(self, posts_dir: str, full_cache_size: int = FULL_POST_CACHE_SIZE):
+        self.posts_dir = posts_dir
+        self.version = 0
+        # 由 watcher 推送变更时为 True，此时请求路径不再扫描文件系统
+        self.watched = False
+        self._lock = threading.Lock()
+        self._entries = {}   # filepath -> (mtime_ns, size, meta)
+        self._by_slug = {}   # slug -> meta
+        self._sorted = []    # 按日期倒序排列的文章元数据列表
+        self._by_category = {}   # 分类 -> 按日期倒序的文章元数据列表
+        self._position = {}  # slug -> 在 _sorted 中的下标
+        self._cat_links = {} # slug -> (同分类上一篇, 同分类下一篇)
+        self._aggregates = None      # 分类 / 标签统计快照，随 version 失效
+        self._full = OrderedDict()   # filepath -> ((mtime_ns, size), 完整文章)
+        self._full_lock = threading.Lock()
+        self._full_cache_size = full_cache_size
+
+    def is_post_file(self, filepath: str) -> bool:
+        """判断路径是否为 posts/ 下需要收录的文章（.md 且不在隐藏目录中）"""
+        if not filepath.endswith(".md"):
+            return False
+        rel = os.path.relpath(filepath, self.posts_dir)
+        parts = rel.replace("\\", "/").split("/")
+        return parts[0] != ".." and not any(p.startswith(".") for p in parts[:-1])
+
+    def _scan(self) -> dict:
+        """遍历 posts/，返回 {filepath: (mtime_ns, size)}"""
+        found = {}
+        for root, dirs, files in os.walk(self.posts_dir):
+            # 忽略隐藏目录
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for filename in files:
+                if not filename.endswith(".md"):
+                    continue
+                filepath = os.path.normpath(os.path.join(root, filename))
+                try:
+                    st = os.stat(filepath)
+                except OSError:
+                    continue
+                found[filepath] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def refresh(self, workers: int = 1) -> bool:
+        """
+        与磁盘同步缓存，返回缓存是否发生变化
+        workers 默认为 1（串行）；只有命令行入口传入 None（BUILD_WORKERS）等以进程池解析冷启动的大量文件
+        """
+        if not os.path.exists(self.posts_dir):
+            os.makedirs(self.posts_dir)
+
+        with self._lock:
+            found = self._scan()
+            changed = False
+
+            # 删除已不存在的文件
+            for filepath in list(self._entries):
+                if filepath not in found:
+                    del self._entries[filepath]
+                    changed = True
+
+            # 新增或修改的文件重新解析
+            dirty = sorted(p for p, stamp in found.items()
+                           if p not in self._entries or self._entries[p][:2] != stamp)
+            for filepath, post in zip(dirty, parse_many(dirty, parse_post_meta, workers)):
+                if post:
+                    self._entries[filepath] = (*found[filepath], post)
+                else:
+                    self._entries.pop(filepath, None)
+                changed = True
+
+            if changed:
+                self._rebuild()
+            return changed
+
+    def update_file(self, filepath: str) -> bool:
+        """增量更新单个文件（新增/修改），文件已不存在时从缓存移除"""
+        filepath = os.path.normpath(filepath)
+        if not self.is_post_file(filepath):
+            return False
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return self.discard(filepath)
+
+        with self._lock:
+            stamp = (st.st_mtime_ns, st.st_size)
+            entry = self._entries.get(filepath)
+            if entry and entry[:2] == stamp:
+                return False
+            post = parse_post_meta(filepath)
+            if post:
+                self._entries[filepath] = (*stamp, post)
+            elif self._entries.pop(filepath, None) is None:
+                return False
+            self._rebuild()
+            return True
+
+    def discard(self, filepath: str) -> bool:
+        """从缓存中移除单个文件"""
+        filepath = os.path.normpath(filepath)
+        with self._lock:
+            if self._entries.pop(filepath, None) is None:
+                return False
+            self._rebuild()
+            return True
+
+    def discard_dir(self, dirpath: str) -> bool:
+        """移除某个目录下的全部文件（目录被删除或移出时）"""
+        prefix = os.path.normpath(dirpath) + os.sep
+        with self._lock:
+            gone = [p for p in self._entries if p.startswith(prefix)]
+            for filepath in gone:
+                del self._entries[filepath]
+            if gone:
+                self._rebuild()
+            return bool(gone)
+
+    def _rebuild(self):
+        posts = [entry[2] for entry in self._entries.values()]
+        posts.sort(key=lambda p: (post_sort_key(p), p["slug"]), reverse=True)
+        self._sorted = posts
+        self._by_slug = {p["slug"]: p for p in posts}
+        self._position = {p["slug"]: i for i, p in enumerate(posts)}
+        by_category = {}
+        for p in posts:
+            by_category.setdefault(p["category"], []).append(p)
+        self._by_category = by_category
+
+        # 同分类内的前后链接：列表为倒序，较新的文章先出现
+        cat_links = {}
+        newest_seen = {}
+        for p in posts:
+            newer = newest_seen.get(p["category"])
+            cat_links[p["slug"]] = [None, newer]
+            if newer is not None:
+                cat_links[newer["slug"]][0] = p
+            newest_seen[p["category"]] = p
+        self._cat_links = {slug: tuple(link) for slug, link in cat_links.items()}
+        self.version += 1
+
+    def posts(self, category: str = None) -> list:
+        """返回按日期倒序的文章列表（返回新列表，文章 dict 为共享对象，请勿修改）"""
+        return list(self.listing(category))
+
+    def listing(self, category: str = None) -> list:
+        """返回内部维护的有序列表本身（不复制），只可读取或切片"""
+        if category:
+            return self._by_category.get(category, [])
+        return self._sorted
+
+    def get(self, slug: str) -> dict | None:
+        return self._by_slug.get(slug)
+
+    def aggregates(self) -> dict:
+        """
+        分类 / 标签统计快照，只在语料版本变化后首次访问时重新计算
+        返回的 dict 在同一版本内被所有请求共享，请勿修改
+        """
+        snapshot = self._aggregates
+        if snapshot is not None and snapshot["version"] == self.version:
+            return snapshot
+
+        with self._lock:
+            posts = self._sorted
+            categories = {}
+            tag_posts = {}
+            category_tags = {}
+            for post in posts:
+                cat = post["category"]
+                categories[cat] = categories.get(cat, 0) + 1
+                cat_tags = category_tags.setdefault(cat, {})
+                for tag in dict.fromkeys(post["tags"]):
+                    tag_posts.setdefault(tag, []).append(post)
+                    cat_tags[tag] = cat_tags.get(tag, 0) + 1
+
+            def by_count(counts: dict) -> dict:
+                return dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+
+            snapshot = {
+                "version": self.version,
+                "categories": categories,
+                "tags": by_count({tag: len(ps) for tag, ps in tag_posts.items()}),
+                "category_tags": {cat: by_count(c) for cat, c in category_tags.items()},
+                "tag_posts": tag_posts,
+            }
+            self._aggregates = snapshot
+            return snapshot
+
+    def neighbours(self, slug: str, same_category: bool = False) -> tuple[dict | None, dict | None]:
+        """
+        返回 (上一篇, 下一篇)：上一篇为更早发布的文章，下一篇为更新的文章
+        same_category=True 时只在同一分类内查找
+        """
+        if same_category:
+            return self._cat_links.get(slug, (None, None))
+        posts = self._sorted
+        idx = self._position.get(slug)
+        if idx is None:
+            return None, None
+        prev_post = posts[idx + 1] if idx + 1 < len(posts) else None
+        next_post = posts[idx - 1] if idx > 0 else None
+        return prev_post, next_post
+
+    def load_full(self, meta: dict) -> dict | None:
+        """返回元数据对应的完整文章（含 content/toc/text/raw），按需渲染"""
+        filepath = meta["filepath"]
+        entry = self._entries.get(filepath)
+        stamp = entry[:2] if entry else None
+
+        with self._full_lock:
+            hit = self._full.get(filepath)
+            if hit and hit[0] == stamp:
+                self._full.move_to_end(filepath)
+                return hit[1]
+
+        post = parse_post(filepath)
+        if post is None:
+            return None
+        with self._full_lock:
+            self._full[filepath] = (stamp, post)
+            self._full.move_to_end(filepath)
+            while len(self._full) > self._full_cache_size:
+                self._full.popitem(last=False)
+        return post
+
+    def load_text(self, meta: dict) -> str | None:
+        """
+        正文纯文本，供搜索索引 / 相关文章等批量建索引使用
+        LRU 中已有时直接取用，否则经渲染缓存解析，结果不放入 LRU，不会挤掉正在被访问的文章
+        """
+        filepath = meta["filepath"]
+        entry = self._entries.get(filepath)
+        stamp = entry[:2] if entry else None
+        with self._full_lock:
+            hit = self._full.get(filepath)
+        if hit and hit[0] == stamp:
+            return hit[1]["text"]
+        post = parse_post(filepath)
+        return post["text"] if post else None
+
+
+corpus = PostCorpus(POSTS_DIR)
+
+
+def get_all_posts(category: str = None) -> list:
+    """返回所有文章的元数据（按日期倒序），不含正文，正文请用 load_full()"""
+    if not corpus.watched:
+        corpus.refresh()
+    return corpus.posts(category)
+
+
+def get_post(slug: str) -> dict | None:
+    """按 slug 获取单篇完整文章（含渲染后的正文）"""
+    if not corpus.watched:
+        corpus.refresh()
+    meta = corpus.get(slug)
+    return corpus.load_full(meta) if meta else None
+
+
+def get_listing(category: str = None) -> list:
+    """按日期倒序的只读文章列表，分页时直接切片，避免复制整个列表"""
+    if not corpus.watched:
+        corpus.refresh()
+    return corpus.listing(category)
+
+
+def paginate(posts: list, page: int, per_page: int) -> dict:
+    """对有序列表分页，只切出当前页的文章"""
+    total = len(posts)
+    pages = max(1, -(-total // per_page))
+    page = min(max(page, 1), pages)
+    start = (page - 1) * per_page
+    return {
+        "items": posts[start:start + per_page],
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "pages": pages,
+        "has_prev": page > 1,
+        "has_next": page < pages,
+    }
+
+
+def get_aggregates() -> dict:
+    """当前语料版本的分类 / 标签统计"""
+    if not corpus.watched:
+        corpus.refresh()
+    return corpus.aggregates()
+
+
+def get_neighbours(slug: str, same_category: bool = False) -> tuple[dict | None, dict | None]:
+    """O(1) 查询上一篇 / 下一篇"""
+    return corpus.neighbours(slug, same_category)
+
+
+def load_full(meta: dict) -> dict | None:
+    """由列表中的文章元数据取得完整文章"""
+    return corpus.load_full(meta)
+
+
+def load_text(meta: dict) -> str | None:
+    """由列表中的文章元数据取得正文纯文本（不占用完整文章的 LRU）"""
+    return corpus.load_text(meta)
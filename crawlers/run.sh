@@ -8,6 +8,8 @@ BLOG_DIR="/home/echo/blog"
 PYTHON="$BLOG_DIR/venv/bin/python3"
 SCRIPT="$BLOG_DIR/crawlers/fetch_news.py"
 SYNC_SCRIPT="$BLOG_DIR/sync_db.py"
+FREEZE_SCRIPT="$BLOG_DIR/freeze.py"
+ROLLUP_SCRIPT="$BLOG_DIR/rollup_views.py"
 
 run_crawler() {
     CATEGORY=$1
@@ -29,6 +31,25 @@ sync_database() {
     echo "✓ 数据库同步完成"
 }
 
+# 汇总阅读日志并清理过期的原始记录
+rollup_views() {
+    echo "▶ 汇总阅读统计..."
+    cd "$BLOG_DIR"
+    $PYTHON $ROLLUP_SCRIPT
+    echo "✓ 阅读统计汇总完成"
+}
+
+# 设置了 BLOG_FREEZE_DIR 时，抓取后增量更新静态导出
+freeze_site() {
+    if [ -z "$BLOG_FREEZE_DIR" ]; then
+        return 0
+    fi
+    echo "▶ 增量更新静态页面..."
+    cd "$BLOG_DIR"
+    $PYTHON $FREEZE_SCRIPT --out "$BLOG_FREEZE_DIR"
+    echo "✓ 静态页面更新完成"
+}
+
 TARGET=${1:-all}
 
 if [ "$TARGET" = "all" ]; then
@@ -38,8 +59,12 @@ if [ "$TARGET" = "all" ]; then
     done
     # 所有爬虫完成后同步数据库
     sync_database
+    rollup_views
+    freeze_site
 else
     run_crawler "$TARGET"
     # 单个爬虫完成后同步数据库
     sync_database
+    rollup_views
+    freeze_site
 fi
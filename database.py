@@ -3,9 +3,65 @@
 """
 
 import os
+import re
+import html
+import hashlib
+import logging
 from datetime import datetime
 from flask import Flask
-from models import db, Post, Tag, ViewLog, SearchIndex
+from sqlalchemy import text, inspect, bindparam, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from models import (db, Post, Tag, ViewLog, SearchIndex, ViewStatHourly, ViewStatDaily,
+                    post_tags)
+from view_buffer import view_buffer
+from view_dedup import view_dedup
+
+logger = logging.getLogger(__name__)
+
+# ── 连接参数（engine profile）────────────────────────────────────────────────
+# 爬虫同步、后台同步与多个 gunicorn worker 的阅读量落库会同时写库，BLOG_DB_PROFILE=off 时使用 SQLAlchemy 默认值
+DB_PROFILE = os.environ.get("BLOG_DB_PROFILE", "on").lower() != "off"
+# SQLite：每个连接建立时执行的 PRAGMA。WAL 下读写互不阻塞，写者之间按 busy_timeout 排队等待
+SQLITE_SYNCHRONOUS = os.environ.get("BLOG_SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("BLOG_SQLITE_BUSY_TIMEOUT", "15000"))
+SQLITE_MMAP_MB = int(os.environ.get("BLOG_SQLITE_MMAP_MB", "256"))
+# MySQL 等服务端数据库：连接池大小与回收时间（应小于服务端 wait_timeout）
+DB_POOL_SIZE = int(os.environ.get("BLOG_DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.environ.get("BLOG_DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.environ.get("BLOG_DB_POOL_RECYCLE", "1800"))
+
+# 增量同步一次最多删除的文章比例：超出（或 posts/ 一篇都没扫到）时视为目录异常，不删除
+SYNC_MAX_DELETE_RATIO = float(os.environ.get("BLOG_SYNC_MAX_DELETE_RATIO", "0.2"))
+# 删除篇数不超过该值时不受比例限制（小站点删一两篇也可能超过比例）
+SYNC_MIN_DELETE_GUARD = 5
+
+
+def engine_options(uri: str) -> dict:
+    """按数据库类型返回 create_engine 参数"""
+    if not DB_PROFILE:
+        return {}
+    if make_url(uri).get_backend_name() == "sqlite":
+        # 与 busy_timeout 一致，驱动层的等待不应先于 PRAGMA 超时
+        return {"connect_args": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        # 取出连接前探活，数据库重启或连接被服务端断开后自动重连
+        "pool_pre_ping": True,
+    }
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_MB * 2 ** 20}")
+    finally:
+        cursor.close()
 
 
 def init_database(app: Flask):
@@ -21,90 +77,444 @@ def init_database(app: Flask):
 
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SQLALCHEMY_ECHO'] = False  # 设置为 True 可以看到 SQL 语句
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 
     # 初始化数据库
     db.init_app(app)
 
     # 创建所有表
     with app.app_context():
+        if DB_PROFILE and db.engine.dialect.name == "sqlite":
+            event.listen(db.engine, "connect", _sqlite_pragmas)
         db.create_all()
+        upgrade_schema()
+        init_fts()
+
+    view_buffer.init_app(app)
 
     return db
 
 
-def sync_posts_from_files(posts_dir: str):
+# 已有数据库升级：create_all 不会给已存在的表添加新列
+_ADDED_COLUMNS = {
+    "posts": {
+        "source_mtime_ns": "BIGINT",
+        "source_size": "INTEGER",
+        "content_hash": "VARCHAR(64)",
+        "published_at": "DATETIME",
+        "toc": "TEXT",
+    },
+}
+
+
+def upgrade_schema():
+    """为旧版本创建的表补齐新增的列与索引"""
+    inspector = inspect(db.engine)
+    for table, columns in _ADDED_COLUMNS.items():
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        for name, ddl in columns.items():
+            if name not in existing:
+                db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                logger.info("数据表 %s 新增列 %s", table, name)
+                if table == "posts" and name == "published_at":
+                    # 先用日期回填排序键，时分与目录在下次全量同步（sync_db.py --full）后补齐
+                    db.session.execute(text("UPDATE posts SET published_at = date"))
+    db.session.commit()
+
+    for table in (Post.__table__, post_tags, ViewLog.__table__):
+        existing = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.engine)
+                logger.info("数据表 %s 新增索引 %s", table.name, index.name)
+
+
+# ── FTS5 全文检索（仅 SQLite）────────────────────────────────────────────────
+#
+# Python 的 sqlite3 无法注册自定义 FTS5 分词器，这里在写入前把每个汉字两侧插入
+# 零宽空格，unicode61 分词器会把单个汉字当作一个词项，中文查询以“逐字短语”匹配，
+# 等价于子串匹配；英文仍按单词切分。snippet() 输出后去掉零宽空格即还原原文。
+
+FTS_TABLE = "search_fts"
+FTS_COLUMNS = ("title", "summary", "tags", "category", "content")
+# BM25 列权重，与 /blog/search 的字段权重（100/50/40/30/20）同比例
+FTS_WEIGHTS = (10.0, 5.0, 4.0, 3.0, 2.0)
+
+_ZWSP = "\u200b"
+_FTS_CJK = re.compile(r"([\u3400-\u4dbf\u4e00-\u9fff])")
+# 单个汉字，或不含汉字的连续字母数字（与 fts_segment 的切分一致，"HR职场" -> hr / 职 / 场）
+_FTS_TERM = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]|[^\W_\u3400-\u4dbf\u4e00-\u9fff]+")
+_HL_OPEN, _HL_CLOSE = "\x02", "\x03"
+
+_fts_enabled = False
+
+
+def fts_available() -> bool:
+    return _fts_enabled
+
+
+def fts_segment(value: str) -> str:
+    return _FTS_CJK.sub(_ZWSP + r"\1" + _ZWSP, value or "")
+
+
+def init_fts():
+    """创建 FTS5 虚拟表；表为空而文章表已有数据时从 posts 表重建"""
+    global _fts_enabled
+    if db.engine.dialect.name != "sqlite":
+        return
+    try:
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            + ", ".join(FTS_COLUMNS)
+            + ", tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        db.session.commit()
+    except OperationalError as e:
+        db.session.rollback()
+        logger.warning("SQLite 不支持 FTS5，数据库搜索回退到 LIKE：%s", e)
+        return
+    _fts_enabled = True
+
+    indexed = db.session.execute(text(f"SELECT COUNT(*) FROM {FTS_TABLE}")).scalar()
+    if not indexed and Post.query.count():
+        rebuild_fts()
+
+
+def fts_upsert(post_id: int, title: str, summary: str, tags: list, category: str, content: str):
+    """写入 / 更新一篇文章的全文索引（随调用方事务提交）"""
+    if not _fts_enabled:
+        return
+    fts_delete(post_id)
+    db.session.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+             "VALUES (:id, :title, :summary, :tags, :category, :content)"),
+        {
+            "id": post_id,
+            "title": fts_segment(title),
+            "summary": fts_segment(summary),
+            "tags": fts_segment(" ".join(str(t) for t in tags)),
+            "category": fts_segment(category),
+            "content": fts_segment(content),
+        },
+    )
+
+
+def fts_delete(post_id: int):
+    if _fts_enabled:
+        db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": post_id})
+
+
+def rebuild_fts():
+    """根据 posts 表全量重建全文索引"""
+    if not _fts_enabled:
+        return
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    for post in Post.query.all():
+        content = re.sub(r"<[^>]+>", "", post.content_html or "").strip()
+        fts_upsert(post.id, post.title, post.summary or "", [t.name for t in post.tags],
+                   post.category, content)
+    db.session.commit()
+
+
+def build_fts_query(query: str) -> str | None:
+    """把用户输入转换为 FTS5 短语查询，最后一个英文词按前缀匹配"""
+    terms = _FTS_TERM.findall(query.lower())
+    if not terms:
+        return None
+    phrase = '"' + " ".join(terms) + '"'
+    if not _FTS_CJK.match(terms[-1]):
+        phrase += " *"
+    return phrase
+
+
+def _clean_snippet(snippet: str) -> tuple[str, str]:
+    """返回 (纯文本片段, 带 <mark> 高亮的安全 HTML 片段)"""
+    snippet = (snippet or "").replace(_ZWSP, "")
+    plain = snippet.replace(_HL_OPEN, "").replace(_HL_CLOSE, "")
+    marked = html.escape(snippet).replace(_HL_OPEN, "<mark>").replace(_HL_CLOSE, "</mark>")
+    return plain, marked
+
+
+def search_fts(query: str, limit: int = 20, offset: int = 0, filters: dict = None) -> list:
+    """
+    FTS5 检索，BM25 排序（按列加权），片段与高亮由 SQLite 生成
+    filters: {"category", "tag", "date_from", "date_to"}，与 MATCH 在同一条 SQL 中过滤（date_to 不含）
+    返回 [{"post_id", "score", "snippet", "snippet_html"}, ...]，score 越大越相关
     """
-    从 Markdown 文件同步文章到数据库
-    这个函数可以手动调用或作为迁移脚本
+    match = build_fts_query(query) if _fts_enabled else None
+    if not match:
+        return []
+    params = {"match": match, "hl_open": _HL_OPEN, "hl_close": _HL_CLOSE,
+              "limit": limit, "offset": offset}
+    conditions = []
+    filters = filters or {}
+    if filters.get("category") is not None:
+        conditions.append("rowid IN (SELECT id FROM posts WHERE category = :category)")
+        params["category"] = filters["category"]
+    if filters.get("tag") is not None:
+        conditions.append("rowid IN (SELECT pt.post_id FROM post_tags pt "
+                          "JOIN tags t ON t.id = pt.tag_id WHERE t.name = :tag)")
+        params["tag"] = filters["tag"]
+    if filters.get("date_from") is not None:
+        conditions.append("rowid IN (SELECT id FROM posts WHERE date >= :date_from)")
+        params["date_from"] = filters["date_from"].date().isoformat()
+    if filters.get("date_to") is not None:
+        conditions.append("rowid IN (SELECT id FROM posts WHERE date < :date_to)")
+        params["date_to"] = filters["date_to"].date().isoformat()
+
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    content_col = FTS_COLUMNS.index("content")
+    where = "".join(" AND " + c for c in conditions)
+    rows = db.session.execute(
+        text(f"SELECT rowid, bm25({FTS_TABLE}, {weights}) AS rank, "
+             f"snippet({FTS_TABLE}, {content_col}, :hl_open, :hl_close, '...', 24) "
+             f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match{where} "
+             "ORDER BY rank LIMIT :limit OFFSET :offset"),
+        params,
+    ).fetchall()
+    hits = []
+    for post_id, rank, snippet in rows:
+        plain, marked = _clean_snippet(snippet)
+        hits.append({"post_id": post_id, "score": -rank, "snippet": plain, "snippet_html": marked})
+    return hits
+
+
+# 单条 IN 查询 / 批量语句的最大行数
+SYNC_CHUNK = 500
+
+
+def _chunks(items: list, size: int = SYNC_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _file_hash(filepath: str) -> str | None:
+    try:
+        with open(filepath, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _tag_ids(names: set) -> dict:
+    """标签名 -> id，一次加载全部标签，缺失的批量插入"""
+    tag_ids = dict(db.session.query(Tag.name, Tag.id).all())
+    missing = sorted(n for n in names if n not in tag_ids)
+    if missing:
+        db.session.execute(Tag.__table__.insert(), [{"name": n} for n in missing])
+        for chunk in _chunks(missing):
+            tag_ids.update(db.session.query(Tag.name, Tag.id).filter(Tag.name.in_(chunk)).all())
+    return tag_ids
+
+
+def _delete_posts(post_ids: list):
+    """删除文章及其标签关联、搜索索引、阅读记录与统计"""
+    for chunk in _chunks(post_ids):
+        db.session.execute(post_tags.delete().where(post_tags.c.post_id.in_(chunk)))
+        for model in (SearchIndex, ViewLog, ViewStatHourly, ViewStatDaily):
+            model.query.filter(model.post_id.in_(chunk)).delete(synchronize_session=False)
+        Post.query.filter(Post.id.in_(chunk)).delete(synchronize_session=False)
+        for post_id in chunk:
+            fts_delete(post_id)
+
+
+def sync_posts_from_files(posts_dir: str, workers: int = None, full: bool = False,
+                          progress=None, allow_delete: bool = False) -> dict:
     """
-    from app import parse_post, get_all_posts
+    从 Markdown 文件增量同步文章到数据库
+    - 文件 mtime / 大小与库中记录一致的文章直接跳过；不一致时再比较内容哈希，内容未变只更新文件戳
+    - 只渲染真正变化的文章，标签一次性加载为 名称 -> id 映射，写入使用批量 INSERT / UPDATE
+    - 文件改名 / 移动（新 slug 与某篇消失文章的内容哈希相同）时更新原记录的 slug，阅读量与统计随之保留
+    - 文件已删除的文章从数据库中移除；未扫描到任何文件，或待删除的超过 SYNC_MAX_DELETE_RATIO 时
+      （如 posts/ 未挂载、路径配置错误）不删除，除非 full=True 或 allow_delete=True
+    full=True 时忽略文件戳与哈希，重新写入全部文章
+    workers 为渲染使用的进程数，默认取 BLOG_BUILD_WORKERS
+    progress(**fields) 用于上报进度（后台任务），字段：phase、scanned、changed、rendered、written、deleted
+    返回 {"created", "updated", "touched", "unchanged", "deleted", "delete_skipped", "renamed"} 计数
+    """
+    from corpus import corpus, parse_many, parse_post
 
     print("开始同步文章到数据库...")
-
-    posts = get_all_posts()
-    for post_data in posts:
-        # 检查文章是否已存在
-        existing = Post.query.filter_by(slug=post_data['slug']).first()
-
-        if existing:
-            # 更新现有文章
-            existing.title = post_data['title']
-            existing.summary = post_data['summary']
-            existing.content_html = post_data['content']
-            existing.content_raw = post_data['raw']
-            existing.filepath = post_data['filepath']
-            existing.category = post_data['category']
-            existing.date = post_data['date']
-            existing.updated_at = datetime.utcnow()
-
-            # 更新标签
-            existing.tags.clear()
-            for tag_name in post_data['tags']:
-                tag = Tag.query.filter_by(name=tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.session.add(tag)
-                existing.tags.append(tag)
-
-            print(f"更新文章: {post_data['title']}")
-        else:
-            # 创建新文章
-            post = Post(
-                slug=post_data['slug'],
-                title=post_data['title'],
-                summary=post_data['summary'],
-                content_html=post_data['content'],
-                content_raw=post_data['raw'],
-                filepath=post_data['filepath'],
-                category=post_data['category'],
-                date=post_data['date']
-            )
-
-            db.session.add(post)
-            db.session.flush()  # 获取 post.id
-
-            # 添加标签
-            for tag_name in post_data['tags']:
-                tag = Tag.query.filter_by(name=tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.session.add(tag)
-                post.tags.append(tag)
-
-            print(f"创建文章: {post_data['title']}")
-            existing = post
-
-        # 更新搜索索引
-        search_text = f"{post_data['title']} {post_data['summary']} {post_data['raw']}"
-        search_index = SearchIndex.query.filter_by(post_id=existing.id).first()
-        if search_index:
-            search_index.content_text = search_text
-        else:
-            search_index = SearchIndex(post_id=existing.id, content_text=search_text)
-            db.session.add(search_index)
+    report = progress or (lambda **fields: None)
+    report(phase="scan")
+
+    # 命令行同步时冷启动解析同样使用 workers 个进程；服务进程内的后台同步传入 workers=1
+    if not corpus.watched:
+        corpus.refresh(workers=workers)
+    files = {}
+    for meta in corpus.posts():
+        try:
+            st = os.stat(meta["filepath"])
+        except OSError:
+            continue
+        files[meta["slug"]] = (meta["filepath"], st.st_mtime_ns, st.st_size)
+
+    rows = {r.slug: r for r in db.session.query(
+        Post.id, Post.slug, Post.source_mtime_ns, Post.source_size, Post.content_hash).all()}
+
+    stats = {"created": 0, "updated": 0, "touched": 0, "unchanged": 0, "deleted": 0, "delete_skipped": 0,
+             "renamed": 0}
+    to_parse, hashes, touched = [], {}, []
+    for slug, (filepath, mtime_ns, size) in files.items():
+        row = rows.get(slug)
+        if row and not full and row.source_mtime_ns == mtime_ns and row.source_size == size:
+            stats["unchanged"] += 1
+            continue
+        digest = _file_hash(filepath)
+        if row and not full and digest is not None and digest == row.content_hash:
+            # 文件被重新写入但内容相同（如爬虫重跑），只刷新文件戳
+            touched.append({"b_id": row.id, "source_mtime_ns": mtime_ns, "source_size": size})
+            continue
+        hashes[slug] = digest
+        to_parse.append(filepath)
+
+    # 改名 / 移动目录：新 slug 的内容哈希与某篇即将删除的文章相同，沿用原记录（保留阅读量与统计）
+    gone = {}
+    for slug, row in rows.items():
+        if slug not in files and row.content_hash:
+            gone.setdefault(row.content_hash, []).append(slug)
+    renames = {}
+    for slug, digest in hashes.items():
+        old = gone.get(digest)
+        if slug not in rows and old and len(old) == 1:
+            renames[slug] = old.pop()
+
+    report(phase="render", scanned=len(files), changed=len(to_parse) + len(touched), rendered=0, written=0)
+
+    # 渲染并行完成，结果按列表顺序依次写库，保证同步结果确定
+    # 渲染在第一条写语句之前完成，写事务（SQLite 的写锁）只覆盖真正的写入；分块渲染以便上报进度
+    parsed = []
+    for chunk in _chunks(to_parse):
+        parsed += [p for p in parse_many(chunk, parse_post, workers) if p]
+        report(rendered=len(parsed))
+
+    report(phase="write")
+
+    if touched:
+        posts = Post.__table__
+        db.session.execute(
+            posts.update().where(posts.c.id == bindparam("b_id"))
+            .values(source_mtime_ns=bindparam("source_mtime_ns"), source_size=bindparam("source_size")),
+            touched,
+        )
+        stats["touched"] = len(touched)
+
+    if renames:
+        posts = Post.__table__
+        db.session.execute(posts.update().where(posts.c.id == bindparam("b_id")).values(slug=bindparam("b_slug")),
+                           [{"b_id": rows[old].id, "b_slug": new} for new, old in renames.items()])
+        for new, old in renames.items():
+            rows[new] = rows.pop(old)
+        stats["renamed"] = len(renames)
+        logger.info("%d 篇文章改名，保留原记录: %s", len(renames),
+                    ", ".join(f"{old} -> {new}" for new, old in sorted(renames.items())))
+
+    for chunk in _chunks(parsed):
+        _write_posts(chunk, rows, files, hashes, stats)
+        report(written=stats["created"] + stats["updated"])
+
+    removed = sorted(slug for slug in rows if slug not in files)
+    suspicious = not files or (len(removed) > SYNC_MIN_DELETE_GUARD
+                               and len(removed) > SYNC_MAX_DELETE_RATIO * len(rows))
+    if removed and suspicious and not (full or allow_delete):
+        stats["delete_skipped"] = len(removed)
+        logger.warning("%s 中扫描到 %d 篇文章，数据库中 %d 篇不在其中，疑似目录异常，未删除"
+                       "（确认后使用 --allow-delete）: %s",
+                       posts_dir, len(files), len(removed), ", ".join(removed[:20]))
+    elif removed:
+        _delete_posts([rows[slug].id for slug in removed])
+        stats["deleted"] = len(removed)
+        logger.info("删除 %d 篇文件已不存在的文章: %s", len(removed), ", ".join(removed))
 
     db.session.commit()
-    print(f"同步完成！共处理 {len(posts)} 篇文章。")
+    report(phase="done", deleted=stats["deleted"])
+    print(f"同步完成！新增 {stats['created']} 篇，更新 {stats['updated']} 篇（其中改名 {stats['renamed']} 篇），"
+          f"删除 {stats['deleted']} 篇，未变化 {stats['unchanged'] + stats['touched']} 篇。")
+    if stats["delete_skipped"]:
+        print(f"⚠ {stats['delete_skipped']} 篇文章的文件不存在但未删除（疑似目录异常），"
+              f"确认无误后使用 --allow-delete 重新同步。")
+    return stats
+
+
+def _write_posts(parsed: list, rows: dict, files: dict, hashes: dict, stats: dict):
+    """批量写入新增 / 变化的文章及其标签、搜索索引"""
+    from corpus import post_sort_key
+
+    now = datetime.utcnow()
+
+    def values(post_data: dict) -> dict:
+        _, mtime_ns, size = files[post_data['slug']]
+        return {
+            "title": post_data['title'],
+            "summary": post_data['summary'],
+            "content_html": post_data['content'],
+            "content_raw": post_data['raw'],
+            "filepath": post_data['filepath'],
+            "category": post_data['category'],
+            "date": post_data['date'],
+            "published_at": post_sort_key(post_data) if post_data['date'] else None,
+            "toc": post_data['toc'],
+            "updated_at": now,
+            "source_mtime_ns": mtime_ns,
+            "source_size": size,
+            "content_hash": hashes.get(post_data['slug']),
+        }
+
+    posts = Post.__table__
+    created = [p for p in parsed if p['slug'] not in rows]
+    updated = [p for p in parsed if p['slug'] in rows]
+
+    if created:
+        db.session.execute(posts.insert(), [
+            dict(values(p), slug=p['slug'], created_at=now, views=0, likes=0) for p in created
+        ])
+    if updated:
+        db.session.execute(
+            posts.update().where(posts.c.id == bindparam("b_id")),
+            [dict(values(p), b_id=rows[p['slug']].id) for p in updated],
+        )
+
+    # 取回新文章的 id
+    post_ids = {p['slug']: rows[p['slug']].id for p in updated}
+    for chunk in _chunks([p['slug'] for p in created]):
+        post_ids.update(db.session.query(Post.slug, Post.id).filter(Post.slug.in_(chunk)).all())
+
+    # 标签关联：只增删有差异的部分
+    tag_ids = _tag_ids({str(t) for p in parsed for t in p['tags']})
+    current = {}
+    for chunk in _chunks([post_ids[p['slug']] for p in updated]):
+        for post_id, tag_id in db.session.execute(
+                post_tags.select().where(post_tags.c.post_id.in_(chunk))):
+            current.setdefault(post_id, set()).add(tag_id)
+    to_add, to_remove = [], []
+    for p in parsed:
+        post_id = post_ids[p['slug']]
+        wanted = {tag_ids[str(t)] for t in p['tags']}
+        existing = current.get(post_id, set())
+        to_add += [{"post_id": post_id, "tag_id": t} for t in wanted - existing]
+        to_remove += [{"b_post": post_id, "b_tag": t} for t in existing - wanted]
+    if to_remove:
+        db.session.execute(post_tags.delete().where(
+            (post_tags.c.post_id == bindparam("b_post")) & (post_tags.c.tag_id == bindparam("b_tag"))
+        ), to_remove)
+    if to_add:
+        db.session.execute(post_tags.insert(), to_add)
+
+    # 搜索索引：先删后批量插入
+    for chunk in _chunks(list(post_ids.values())):
+        SearchIndex.query.filter(SearchIndex.post_id.in_(chunk)).delete(synchronize_session=False)
+    db.session.execute(SearchIndex.__table__.insert(), [
+        {"post_id": post_ids[p['slug']],
+         "content_text": f"{p['title']} {p['summary']} {p['raw']}",
+         "updated_at": now}
+        for p in parsed
+    ])
+    for p in parsed:
+        fts_upsert(post_ids[p['slug']], p['title'], p['summary'], p['tags'], p['category'], p['text'])
+        print(f"{'更新' if p['slug'] in rows else '创建'}文章: {p['title']}")
+
+    stats["created"] += len(created)
+    stats["updated"] += len(updated)
 
 
 def get_post_from_db(slug: str):
@@ -130,10 +540,15 @@ def get_posts_from_db(category: str = None, tag: str = None, limit: int = None):
     return query.all()
 
 
-def search_in_db(query: str, limit: int = 20):
-    """在数据库中搜索"""
+def search_in_db(query: str, limit: int = 20, use_fts: bool = True):
+    """在数据库中搜索；SQLite 支持 FTS5 时按 BM25 相关度排序，否则（或 use_fts=False）回退到 LIKE"""
     from sqlalchemy import or_, func
 
+    if use_fts and fts_available():
+        hits = search_fts(query, limit)
+        posts = {p.id: p for p in Post.query.filter(Post.id.in_([h["post_id"] for h in hits])).all()}
+        return [posts[h["post_id"]] for h in hits if h["post_id"] in posts]
+
     search_term = f"%{query.lower()}%"
 
     # 搜索标题、摘要和内容
@@ -148,20 +563,16 @@ def search_in_db(query: str, limit: int = 20):
     return posts
 
 
-def increment_views(post_id: int, ip_address: str = None, user_agent: str = None):
-    """增加文章阅读量"""
-    post = Post.query.get(post_id)
-    if post:
-        post.views += 1
-
-        # 记录阅读日志
-        log = ViewLog(
-            post_id=post_id,
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-        db.session.add(log)
-
-        db.session.commit()
-
-    return post.views
+def increment_views(post_id: int, ip_address: str = None, user_agent: str = None,
+                    views: int = None) -> int:
+    """
+    增加文章阅读量：写入进程内缓冲，由后台线程批量落库（见 view_buffer.py）
+    爬虫与去重窗口内的重复阅读不计数、不写库（见 view_dedup.py）
+    views 为调用方已读到的数据库阅读量（省去一次查询），返回值包含尚未落库的增量
+    """
+    if views is None:
+        post = db.session.get(Post, post_id)
+        views = post.views if post else 0
+    if not view_dedup.should_count(post_id, ip_address, user_agent):
+        return (views or 0) + view_buffer.pending(post_id)
+    return (views or 0) + view_buffer.record(post_id, ip_address, user_agent)
@@ -0,0 +1,192 @@
+"""
+数据库取文（BLOG_SERVE_FROM=db）
+公开页面直接读取 sync_db.py 同步到 posts 表的数据：正文为同步时预先渲染的 HTML，
+列表页按 (分类, 发布时间) / 标签索引分页查询，不遍历 posts/、不渲染 Markdown
+多台应用服务器可共用同一个 MySQL 数据库，只需其中一台（或定时任务）负责同步
+
+返回的 dict 与 corpus 中的文章元数据字段一致，模板无需区分来源
+需在应用上下文中调用
+"""
+
+import os
+import time
+import threading
+from datetime import datetime
+
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import defer
+
+from models import db, Post, Tag, post_tags
+
+# 分类 / 标签统计的缓存秒数：每个页面都要用到，多台服务器之间最多相差这么久
+AGGREGATES_TTL = float(os.environ.get("BLOG_DB_CACHE_TTL", "30"))
+
+# 列表页只取元数据列，正文等大字段只在详情页读取
+_META_COLUMNS = (Post.id, Post.slug, Post.title, Post.summary, Post.category,
+                 Post.published_at, Post.date)
+
+_aggregates = None
+_aggregates_at = 0.0
+_aggregates_lock = threading.Lock()
+
+
+def format_date(row) -> str:
+    """与文件解析的 date_str 一致：有时分时显示到分钟"""
+    ts = row.published_at
+    if ts is None:
+        return row.date.strftime("%Y年%m月%d日") if row.date else "未知日期"
+    if ts.hour or ts.minute:
+        return ts.strftime("%Y年%m月%d日 %H:%M")
+    return ts.strftime("%Y年%m月%d日")
+
+
+def _tags_for(post_ids: list) -> dict:
+    """一次查询取出多篇文章的标签：post_id -> [标签名, ...]"""
+    tags = {post_id: [] for post_id in post_ids}
+    if not post_ids:
+        return tags
+    rows = (db.session.query(post_tags.c.post_id, Tag.name)
+            .join(Tag, Tag.id == post_tags.c.tag_id)
+            .filter(post_tags.c.post_id.in_(post_ids))
+            .order_by(Tag.id))
+    for post_id, name in rows:
+        tags[post_id].append(name)
+    return tags
+
+
+def _to_meta(row, tags: list) -> dict:
+    return {
+        "id": row.id,
+        "slug": row.slug,
+        "title": row.title,
+        "summary": row.summary or "",
+        "category": row.category,
+        "date": row.published_at or row.date,
+        "date_str": format_date(row),
+        "tags": tags,
+    }
+
+
+def _newest_first(query):
+    # 与文件模式排序一致：发布时间倒序、同一时间按 slug 倒序，缺失日期排在最后（NULL 最小）
+    return query.order_by(Post.published_at.desc(), Post.slug.desc())
+
+
+# ── 列表 ──────────────────────────────────────────────────────────────────────
+
+def get_listing_page(category: str = None, tag: str = None, page: int = 1, per_page: int = 20) -> dict:
+    """按日期倒序分页，返回与 corpus.paginate 相同结构的 dict"""
+    query = db.session.query(*_META_COLUMNS)
+    if category:
+        query = query.filter(Post.category == category)
+    if tag:
+        query = query.join(post_tags, post_tags.c.post_id == Post.id) \
+            .join(Tag, Tag.id == post_tags.c.tag_id).filter(Tag.name == tag)
+
+    total = query.order_by(None).count()
+    pages = max(1, -(-total // per_page))
+    page = min(max(page, 1), pages)
+    rows = _newest_first(query).offset((page - 1) * per_page).limit(per_page).all() if total else []
+    tags = _tags_for([r.id for r in rows])
+    return {
+        "items": [_to_meta(r, tags[r.id]) for r in rows],
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "pages": pages,
+        "has_prev": page > 1,
+        "has_next": page < pages,
+    }
+
+
+def get_aggregates() -> dict:
+    """
+    分类 / 标签统计（结构同 corpus.aggregates，不含 tag_posts），缓存 AGGREGATES_TTL 秒
+    返回的 dict 在缓存期内被所有请求共享，请勿修改
+    """
+    global _aggregates, _aggregates_at
+    if _aggregates is not None and time.monotonic() - _aggregates_at < AGGREGATES_TTL:
+        return _aggregates
+
+    with _aggregates_lock:
+        if _aggregates is not None and time.monotonic() - _aggregates_at < AGGREGATES_TTL:
+            return _aggregates
+
+        # 分类按最新文章的发布时间排序，与文件模式的出现顺序一致
+        categories = dict(db.session.query(Post.category, func.count(Post.id))
+                          .group_by(Post.category)
+                          .order_by(func.max(Post.published_at).desc(), func.max(Post.slug).desc()).all())
+        # 数量相同的标签按最近使用时间排序，与文件模式的出现顺序一致
+        latest = func.max(Post.published_at)
+        rows = (db.session.query(Post.category, Tag.name, func.count(Post.id), latest)
+                .join(post_tags, post_tags.c.post_id == Post.id)
+                .join(Tag, Tag.id == post_tags.c.tag_id)
+                .group_by(Post.category, Tag.name)
+                .order_by(latest.desc()))
+        tags, category_tags = {}, {}
+        for category, name, n, _ in rows:
+            tags[name] = tags.get(name, 0) + n
+            category_tags.setdefault(category, {})[name] = n
+
+        def by_count(counts: dict) -> dict:
+            return dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+
+        _aggregates = {
+            "categories": categories,
+            "tags": by_count(tags),
+            "category_tags": {cat: by_count(c) for cat, c in category_tags.items()},
+        }
+        _aggregates_at = time.monotonic()
+        return _aggregates
+
+
+def clear_cache():
+    """本进程写入文章后立即失效统计缓存（其他服务器等待 TTL 到期）"""
+    global _aggregates
+    _aggregates = None
+
+
+# ── 单篇文章 ──────────────────────────────────────────────────────────────────
+
+def get_post(slug: str) -> dict | None:
+    """按 slug 取完整文章（预渲染的正文与目录），另附 id / views 供阅读量统计使用"""
+    row = Post.query.options(defer(Post.content_raw)).filter_by(slug=slug).first()
+    if row is None:
+        return None
+    post = _to_meta(row, _tags_for([row.id])[row.id])
+    post.update({
+        "content": row.content_html or "",
+        "toc": row.toc or "",
+        "views": row.views or 0,
+    })
+    return post
+
+
+def get_neighbours(post: dict, same_category: bool = False) -> tuple[dict | None, dict | None]:
+    """
+    返回 (上一篇, 下一篇)：上一篇为更早发布的文章，下一篇为更新的文章
+    各为一次按 (published_at, slug) 的索引查询，只返回 slug / title 等元数据
+    """
+    slug = post["slug"]
+    # date 只有在 published_at 为空时才会退回到日期类型
+    ts = post["date"] if isinstance(post["date"], datetime) else None
+
+    if ts is None:
+        older = and_(Post.published_at.is_(None), Post.slug < slug)
+        newer = or_(Post.published_at.isnot(None), Post.slug > slug)
+    else:
+        older = or_(Post.published_at < ts, and_(Post.published_at == ts, Post.slug < slug),
+                    Post.published_at.is_(None))
+        newer = or_(Post.published_at > ts, and_(Post.published_at == ts, Post.slug > slug))
+
+    def first(condition, order):
+        query = db.session.query(*_META_COLUMNS).filter(condition)
+        if same_category:
+            query = query.filter(Post.category == post["category"])
+        row = query.order_by(*order).first()
+        return _to_meta(row, []) if row else None
+
+    # 升序时 NULL 排在最前，正好对应"缺失日期的文章之后是最早的有日期文章"
+    prev_post = first(older, (Post.published_at.desc(), Post.slug.desc()))
+    next_post = first(newer, (Post.published_at.asc(), Post.slug.asc()))
+    return prev_post, next_post
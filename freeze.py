@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+静态导出（freeze）
+把所有公开页面渲染成 HTML 文件，由 nginx 直接提供服务，未命中的请求再回落到 Flask
+
+用法:
+  python freeze.py                 # 增量更新（首次运行时全量）
+  python freeze.py --full          # 全量重建
+  python freeze.py --out /var/www/blog-static
+
+输出结构（页面 URL → 文件）:
+  /blog/posts          → <out>/blog/posts/index.html
+  /blog/posts?page=3   → <out>/blog/posts/page-3.html
+  /blog/ai/xxx         → <out>/blog/ai/xxx/index.html
+  静态搜索索引         → <out>/blog/search-index.json
+
+nginx 配置示例:
+  location /blog {
+      root /var/www/blog-static;
+      try_files $uri/page-$arg_page.html $uri/index.html @flask;
+  }
+
+增量规则：对比上次导出时记录的清单（<out>/.freeze-manifest.json），只重新渲染
+变化文章本身、前后导航或相关文章发生变化的文章、变化文章所在分类 / 标签的列表页以及首页与全部文章页
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import logging
+import argparse
+import threading
+from urllib.parse import quote, unquote
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static_site")
+MANIFEST_NAME = ".freeze-manifest.json"
+SEARCH_INDEX_PATH = "blog/search-index.json"
+# 静态搜索索引中每篇文章保留的正文字符数
+SEARCH_TEXT_CHARS = 1000
+
+
+# ── 输出 ─────────────────────────────────────────────────────────────────────
+
+def _page_files(url: str, page: int = None) -> list:
+    """URL → 相对输出路径；列表页第 1 页同时写入 index.html 与 page-1.html"""
+    base = url.strip("/")
+    if page is None:
+        return [os.path.join(base, "index.html")]
+    if page == 1:
+        return [os.path.join(base, "index.html"), os.path.join(base, "page-1.html")]
+    return [os.path.join(base, f"page-{page}.html")]
+
+
+def _write(out_dir: str, rel_path: str, data: bytes):
+    """
+    先写临时文件再原子替换，nginx 不会读到写了一半的页面
+    临时文件名唯一，同时进行的多个导出写同一页面时不会互相覆盖对方的临时文件
+    """
+    path = os.path.join(out_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    f = tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=".freeze-", suffix=".tmp", delete=False)
+    try:
+        with f:
+            f.write(data)
+        # NamedTemporaryFile 以 0600 创建，页面需要 nginx 可读
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+    except BaseException:
+        if os.path.exists(f.name):
+            os.remove(f.name)
+        raise
+
+
+class Freezer:
+    """通过 Flask test client 渲染页面并写入输出目录"""
+
+    def __init__(self, app, out_dir: str):
+        self.app = app
+        self.out_dir = out_dir
+        self.client = app.test_client()
+        self.written = set()
+        self.rendered = 0
+
+    def render(self, url: str, page: int = None) -> bool:
+        """url 为未转义的页面路径（同时决定输出文件位置），请求时逐段转义"""
+        query = f"?page={page}" if page and page > 1 else ""
+        # blog.freeze 只能经由 WSGI environ 设置，外部请求无法伪造，用于跳过阅读量统计
+        resp = self.client.get(_quote_path(url) + query, environ_base={"blog.freeze": True})
+        if resp.status_code != 200:
+            logger.warning("跳过 %s%s（HTTP %s）", url, query, resp.status_code)
+            return False
+        for rel in _page_files(url, page):
+            _write(self.out_dir, rel, resp.data)
+            self.written.add(rel)
+        self.rendered += 1
+        return True
+
+    def render_listing(self, url: str, total: int, per_page: int):
+        pages = max(1, -(-total // per_page))
+        for page in range(1, pages + 1):
+            self.render(url, page)
+        # 删除文章减少后多出来的分页文件
+        target = os.path.join(self.out_dir, url.strip("/"))
+        if os.path.isdir(target):
+            for name in os.listdir(target):
+                if name.startswith("page-") and name.endswith(".html"):
+                    try:
+                        n = int(name[5:-5])
+                    except ValueError:
+                        continue
+                    if n > pages:
+                        os.remove(os.path.join(target, name))
+
+    def remove(self, url: str):
+        target = os.path.join(self.out_dir, url.strip("/"))
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+
+
+# ── 清单 ─────────────────────────────────────────────────────────────────────
+
+def _snapshot(posts: list, get_neighbours, get_related) -> dict:
+    """记录每篇文章的文件戳、归属、前后导航与相关文章，用于下次增量比较"""
+    snapshot = {}
+    for post in posts:
+        try:
+            st = os.stat(post["filepath"])
+            stamp = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            stamp = None
+        nav = [p["slug"] if p else None
+               for p in (*get_neighbours(post["slug"]), *get_neighbours(post["slug"], True))]
+        snapshot[post["slug"]] = {
+            "stamp": stamp,
+            "title": post["title"],
+            "category": post["category"],
+            "tags": list(post["tags"]),
+            "nav": nav,
+            "related": [p["slug"] for p in get_related(post["slug"])],
+        }
+    return snapshot
+
+
+def _load_manifest(out_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _quote_path(path: str) -> str:
+    """页面路径逐段 URL 转义：标签 C# 请求 /blog/tag/C%23，而不是被 # 截断成 /blog/tag/C"""
+    return "/".join(quote(segment, safe="") for segment in path.split("/"))
+
+
+def _safe_segment(value) -> bool:
+    """
+    分类 / 标签名 / slug 的一段要同时作为 URL 路径段与目录名使用：
+    转义后必须能还原（nginx 按解码后的 $uri 查找文件），且不含路径分隔符、控制字符等
+    """
+    value = str(value)
+    if not value or value in (".", "..") or "/" in value or "\\" in value or not value.isprintable():
+        return False
+    if len(value.encode("utf-8", "surrogatepass")) > 255:
+        return False
+    try:
+        return unquote(quote(value, safe="")) == value
+    except UnicodeEncodeError:
+        return False
+
+
+def _exportable(value, nested: bool = False) -> bool:
+    """分类 / 标签名须为单独一段；文章 slug（nested=True）按 / 分段逐段检查。不可导出时记录警告"""
+    value = str(value)
+    ok = all(_safe_segment(segment) for segment in value.split("/")) if nested else _safe_segment(value)
+    if not ok:
+        logger.warning("跳过无法作为 URL / 文件路径导出的页面: %r", value)
+    return ok
+
+
+# ── 导出 ─────────────────────────────────────────────────────────────────────
+
+def freeze(out_dir: str = DEFAULT_OUT, full: bool = False) -> dict:
+    """导出静态站点，返回统计信息；无清单或 full=True 时全量重建"""
+    from app import app, POSTS_PER_PAGE
+    from corpus import get_all_posts, get_neighbours, get_aggregates, load_full
+    from related import get_related, refresh_related
+
+    os.makedirs(out_dir, exist_ok=True)
+    previous_manifest = _load_manifest(out_dir)
+    manifest = None if full else previous_manifest
+    posts = get_all_posts()
+    aggregates = get_aggregates()
+    # 相关文章平时在后台计算，导出前同步算完，保证写出的页面完整
+    refresh_related()
+    current = _snapshot(posts, get_neighbours, get_related)
+    tag_counts = {str(k): v for k, v in aggregates["tags"].items()}
+
+    freezer = Freezer(app, out_dir)
+
+    if manifest is None:
+        post_slugs = set(current)
+        categories = set(aggregates["categories"])
+        tags = set(aggregates["tag_posts"])
+        # 全量重建时仍清理上次导出过、但现在已不存在的文章页
+        previous = previous_manifest["posts"] if previous_manifest else {}
+        removed = {s: previous[s] for s in previous if s not in current}
+    else:
+        previous = manifest["posts"]
+        changed = {s for s in current if s not in previous or previous[s]["stamp"] != current[s]["stamp"]
+                   or previous[s]["title"] != current[s]["title"]}
+        removed = {s: previous[s] for s in previous if s not in current}
+        if not changed and not removed:
+            logger.info("没有文章变化，跳过导出")
+            return {"rendered": 0, "removed": 0, "full": False}
+
+        # 自身变化，或前后导航 / 相关文章变化的页面都需要重新渲染
+        post_slugs = changed | {s for s in current if s in previous and (
+            previous[s]["nav"] != current[s]["nav"] or previous[s].get("related") != current[s]["related"])}
+        touched = [current[s] for s in changed] + [previous[s] for s in changed if s in previous] + list(removed.values())
+        categories = {p["category"] for p in touched}
+        tags = {t for p in touched for t in p["tags"]}
+        if manifest.get("tag_counts") != tag_counts:
+            # 标签云计数变化会影响所有标签页的侧边栏
+            tags |= set(aggregates["tag_posts"])
+
+    # 文章页
+    for slug in sorted(post_slugs):
+        if _exportable(slug, nested=True):
+            freezer.render(f"/blog/{slug}")
+    for slug in removed:
+        if _exportable(slug, nested=True):
+            freezer.remove(f"/blog/{slug}")
+
+    # 首页与列表页
+    freezer.render("/")
+    freezer.render("/blog")
+    freezer.render_listing("/blog/posts", len(posts), POSTS_PER_PAGE)
+    for cat in sorted(categories, key=str):
+        if not _exportable(cat):
+            continue
+        count = aggregates["categories"].get(cat, 0)
+        if count:
+            freezer.render_listing(f"/blog/category/{cat}", count, POSTS_PER_PAGE)
+        else:
+            freezer.remove(f"/blog/category/{cat}")
+    for tag in sorted(tags, key=str):
+        if not _exportable(tag):
+            continue
+        tagged = aggregates["tag_posts"].get(tag)
+        if tagged:
+            freezer.render_listing(f"/blog/tag/{tag}", len(tagged), POSTS_PER_PAGE)
+        else:
+            freezer.remove(f"/blog/tag/{tag}")
+
+    # 静态搜索索引：未变化文章沿用上次的条目，只为变化的文章加载正文
+    previous_index = {}
+    if manifest is not None:
+        try:
+            with open(os.path.join(out_dir, SEARCH_INDEX_PATH), "r", encoding="utf-8") as f:
+                previous_index = {item["slug"]: item for item in json.load(f)}
+        except (OSError, ValueError, KeyError, TypeError):
+            previous_index = {}
+    index = []
+    for meta in posts:
+        if meta["slug"] in previous_index and meta["slug"] not in post_slugs:
+            index.append(previous_index[meta["slug"]])
+            continue
+        post = load_full(meta) or meta
+        index.append({
+            "slug": meta["slug"],
+            "title": meta["title"],
+            "date_str": meta["date_str"],
+            "summary": meta["summary"],
+            "tags": meta["tags"],
+            "category": meta["category"],
+            "text": post.get("text", "")[:SEARCH_TEXT_CHARS],
+        })
+    _write(out_dir, SEARCH_INDEX_PATH, json.dumps(index, ensure_ascii=False, default=str).encode("utf-8"))
+
+    _write(out_dir, MANIFEST_NAME, json.dumps(
+        {"posts": current, "tag_counts": tag_counts}, ensure_ascii=False
+    ).encode("utf-8"))
+
+    stats = {"rendered": freezer.rendered, "removed": len(removed), "full": manifest is None}
+    logger.info("静态导出完成: %s", stats)
+    return stats
+
+
+# ── 后台增量导出（管理后台修改文章后触发）────────────────────────────────────
+
+_freeze_lock = threading.Lock()
+_freeze_pending = threading.Event()
+
+
+def schedule_freeze(out_dir: str):
+    """在后台线程中增量导出；导出进行中再次触发时，结束后补跑一次"""
+    _freeze_pending.set()
+    if not _freeze_lock.acquire(blocking=False):
+        return
+
+    def run():
+        while True:
+            try:
+                while _freeze_pending.is_set():
+                    _freeze_pending.clear()
+                    try:
+                        freeze(out_dir)
+                    except Exception:
+                        logger.exception("后台静态导出失败")
+            finally:
+                _freeze_lock.release()
+            # 释放锁之后才到达的触发，由本线程接着处理
+            if not _freeze_pending.is_set() or not _freeze_lock.acquire(blocking=False):
+                return
+
+    threading.Thread(target=run, name="freeze", daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导出静态站点")
+    parser.add_argument("--out", default=os.environ.get("BLOG_FREEZE_DIR") or DEFAULT_OUT,
+                        help="输出目录，默认取环境变量 BLOG_FREEZE_DIR 或 static_site/")
+    parser.add_argument("--full", action="store_true", help="忽略清单，全量重建")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    # 命令行导出不需要常驻监听
+    os.environ.setdefault("BLOG_WATCH", "off")
+
+    try:
+        from corpus import corpus
+        # 命令行导出时冷启动解析交给进程池（服务进程中的后台导出只串行解析）
+        corpus.refresh(workers=None)
+        stats = freeze(args.out, full=args.full)
+        print(f"✓ 导出完成：渲染 {stats['rendered']} 个页面，删除 {stats['removed']} 篇文章 → {args.out}")
+    except Exception as e:
+        print(f"✗ 导出失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
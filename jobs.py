@@ -0,0 +1,186 @@
+"""
+后台任务
+管理后台触发的耗时操作（如数据库同步）在后台线程中执行，请求立即返回，页面轮询进度
+- 同一类任务同时只运行一个（single-flight）：进程内用锁，多 worker 部署时再加文件锁（fcntl）
+- 任务状态与进度写入 cache/jobs/<name>.json，处理轮询请求的 worker 不必是启动任务的那个
+不依赖外部消息队列；进程退出时正在运行的任务随之中止，其状态按文件锁是否仍被持有判断为 interrupted
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+JOB_DIR = os.environ.get("BLOG_JOB_DIR") or os.path.join(os.path.dirname(__file__), "cache", "jobs")
+# 进度写入状态文件的最短间隔（秒），开始与结束时总是写入
+SAVE_INTERVAL = 0.5
+
+
+class Job:
+    """一次任务运行：状态为 running / done / failed，progress 由任务函数通过 update() 上报"""
+
+    def __init__(self, name: str, path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = "running"
+        self.started_at = time.time()
+        self.finished_at = None
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self._path = path
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, **fields):
+        with self._lock:
+            self.progress.update(fields)
+        self.save(force=False)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "status": self.status,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed": round((self.finished_at or time.time()) - self.started_at, 2),
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+            }
+
+    def save(self, force: bool = True):
+        now = time.monotonic()
+        if not force and now - self._saved_at < SAVE_INTERVAL:
+            return
+        self._saved_at = now
+        tmp = f"{self._path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, default=str)
+            os.replace(tmp, self._path)
+        except OSError:
+            logger.exception("写入任务状态失败: %s", self._path)
+
+
+class JobRunner:
+    """按任务名 single-flight 的后台线程执行器"""
+
+    def __init__(self, job_dir: str = JOB_DIR):
+        self.job_dir = job_dir
+        self._jobs = {}      # name -> 本进程最近一次运行的 Job
+        self._locks = {}     # name -> threading.Lock
+        self._pending = set()  # 运行中又被请求、结束后需要补跑的任务名
+        self._guard = threading.Lock()
+
+    def _path(self, name: str, suffix: str) -> str:
+        return os.path.join(self.job_dir, f"{name}.{suffix}")
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def _try_file_lock(self, name: str):
+        """取得跨进程文件锁，返回打开的文件对象；已被其他进程持有时返回 None"""
+        f = open(self._path(name, "lock"), "a")
+        if fcntl is None:
+            return f
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return None
+        return f
+
+    def start(self, name: str, target, *args, rerun: bool = False) -> tuple[dict, bool]:
+        """
+        在后台线程中运行 target(job, *args)，返回值记为任务结果
+        同名任务正在运行时不再启动，返回 (正在运行的任务状态, False)；
+        rerun=True 时由本进程中正在运行的任务结束后再补跑一次（如运行中又有文章写入）
+        """
+        os.makedirs(self.job_dir, exist_ok=True)
+        lock = self._lock_for(name)
+        if not lock.acquire(blocking=False):
+            if rerun:
+                self._pending.add(name)
+            return self.status(name), False
+        file_lock = self._try_file_lock(name)
+        if file_lock is None:
+            lock.release()
+            if rerun:
+                logger.warning("后台任务 %s 正在其他进程中运行，本次不补跑", name)
+            return self.status(name), False
+
+        job = self._new_job(name)
+
+        def run():
+            current = job
+            try:
+                while True:
+                    self._pending.discard(name)
+                    self._execute(current, target, args)
+                    if name not in self._pending:
+                        break
+                    current = self._new_job(name)
+            finally:
+                file_lock.close()
+                lock.release()
+            # 释放锁之后才到达的补跑请求，由本线程接着处理
+            if name in self._pending:
+                self.start(name, target, *args, rerun=True)
+
+        threading.Thread(target=run, name=f"job-{name}", daemon=True).start()
+        return job.to_dict(), True
+
+    def _new_job(self, name: str) -> Job:
+        job = Job(name, self._path(name, "json"))
+        self._jobs[name] = job
+        job.save()
+        return job
+
+    def _execute(self, job: Job, target, args: tuple):
+        try:
+            result = target(job, *args)
+            with job._lock:
+                job.result, job.status = result, "done"
+        except Exception as e:
+            logger.exception("后台任务 %s 失败", job.name)
+            with job._lock:
+                job.error, job.status = f"{type(e).__name__}: {e}", "failed"
+        finally:
+            job.finished_at = time.time()
+            job.save()
+
+    def status(self, name: str) -> dict | None:
+        """任务最近一次运行的状态；从未运行过时返回 None"""
+        job = self._jobs.get(name)
+        if job is not None and job.status == "running":
+            return job.to_dict()
+        try:
+            with open(self._path(name, "json"), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return job.to_dict() if job else None
+        if data.get("status") == "running":
+            # 状态文件显示运行中但文件锁无人持有：运行它的进程已退出
+            file_lock = self._try_file_lock(name) if fcntl is not None else None
+            if file_lock is not None:
+                file_lock.close()
+                data["status"] = "interrupted"
+            else:
+                data["elapsed"] = round(time.time() - data["started_at"], 2)
+        return data
+
+
+job_runner = JobRunner()
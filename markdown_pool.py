@@ -0,0 +1,102 @@
+"""
+Markdown 转换器池 + 代码高亮缓存
+- 复用预先配置好的 markdown.Markdown 实例，避免每篇文章都重新加载五个扩展
+- 按 (语言, 代码内容哈希, 高亮参数) 缓存 Pygments 输出，简报与技术文章里重复的代码片段只高亮一次
+"""
+
+import os
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import markdown
+from markdown.extensions import codehilite, fenced_code
+
+# 代码高亮缓存的最大条目数
+CODE_CACHE_SIZE = int(os.environ.get("BLOG_CODE_CACHE_SIZE", "2048"))
+
+
+# ── 代码高亮缓存 ──────────────────────────────────────────────────────────────
+
+class _HiliteMemo:
+    """线程安全的 LRU，值为高亮后的 HTML 片段"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            html = self._data.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key, html: str):
+        with self._lock:
+            self._data[key] = html
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+hilite_memo = _HiliteMemo(CODE_CACHE_SIZE)
+
+
+class MemoCodeHilite(codehilite.CodeHilite):
+    """带缓存的 CodeHilite：参数与源码完全相同的代码块直接返回上次的高亮结果"""
+
+    def hilite(self, shebang: bool = True) -> str:
+        digest = hashlib.sha1(self.src.encode("utf-8")).hexdigest()
+        options = repr(sorted(self.options.items(), key=lambda kv: kv[0]))
+        key = (self.lang, digest, shebang, self.guess_lang, self.use_pygments,
+               self.lang_prefix, repr(self.pygments_formatter), options)
+        html = hilite_memo.get(key)
+        if html is None:
+            html = super().hilite(shebang)
+            hilite_memo.put(key, html)
+        return html
+
+
+# fenced_code 与 codehilite 都通过模块级名称 CodeHilite 创建高亮器，替换后两条路径都走缓存
+fenced_code.CodeHilite = MemoCodeHilite
+codehilite.CodeHilite = MemoCodeHilite
+
+
+# ── 转换器池 ──────────────────────────────────────────────────────────────────
+
+class MarkdownPool:
+    """预配置 Markdown 实例的池，借出时独占，归还前调用 reset()，可在多线程下使用"""
+
+    def __init__(self, extensions: list, extension_configs: dict, max_idle: int = 8):
+        self.extensions = extensions
+        self.extension_configs = extension_configs
+        self.max_idle = max_idle
+        self._idle = queue.SimpleQueue()
+
+    def _create(self) -> markdown.Markdown:
+        return markdown.Markdown(
+            extensions=self.extensions,
+            extension_configs=self.extension_configs,
+        )
+
+    @contextmanager
+    def converter(self):
+        try:
+            md = self._idle.get_nowait()
+        except queue.Empty:
+            md = self._create()
+        try:
+            yield md
+        finally:
+            md.reset()
+            if self._idle.qsize() < self.max_idle:
+                self._idle.put(md)
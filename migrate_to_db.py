@@ -6,11 +6,21 @@
 
 import os
 import sys
+import argparse
+
+# 命令行任务不需要常驻监听，须在导入 app 之前设置
+os.environ.setdefault("BLOG_WATCH", "off")
+
 from database import sync_posts_from_files
 from models import db, Post, Tag, ViewLog, SearchIndex
 from app import app
 
 def main():
+    parser = argparse.ArgumentParser(description="将 Markdown 文件迁移到数据库")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="并行渲染的进程数，默认取环境变量 BLOG_BUILD_WORKERS 或 CPU 核数")
+    args = parser.parse_args()
+
     print("开始数据库迁移...")
     print("-" * 50)
 
@@ -21,7 +31,7 @@ def main():
     with app.app_context():
         # 创建所有表
         db.create_all()
-        sync_posts_from_files(POSTS_DIR)
+        sync_posts_from_files(POSTS_DIR, workers=args.workers)
 
     print("-" * 50)
     print("✓ 数据库迁移完成！")
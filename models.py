@@ -28,6 +28,8 @@ class Post(db.Model):
 
     # 元数据
     date = db.Column(db.Date, index=True)
+    published_at = db.Column(db.DateTime, index=True)  # 含时分的发布时间，列表排序键
+    toc = db.Column(db.Text)           # 渲染时生成的目录 HTML
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -35,6 +37,14 @@ class Post(db.Model):
     views = db.Column(db.Integer, default=0)
     likes = db.Column(db.Integer, default=0)
 
+    # 源文件变更检测（sync_posts_from_files 增量同步）
+    source_mtime_ns = db.Column(db.BigInteger)
+    source_size = db.Column(db.Integer)
+    content_hash = db.Column(db.String(64))
+
+    # 分类列表页按发布时间倒序分页
+    __table_args__ = (db.Index('ix_posts_category_published_at', 'category', 'published_at', 'slug'),)
+
     def __repr__(self):
         return f'<Post {self.title}>'
 
@@ -55,7 +65,9 @@ class Tag(db.Model):
 # ── 文章-标签关联表 ───────────────────────────────────────────────────────────
 post_tags = db.Table('post_tags',
     db.Column('post_id', db.Integer, db.ForeignKey('posts.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    # 主键以 post_id 开头，按标签查文章需要单独的索引
+    db.Index('ix_post_tags_tag_id', 'tag_id'),
 )
 
 
@@ -68,10 +80,53 @@ class ViewLog(db.Model):
     post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=False)
     ip_address = db.Column(db.String(50))
     user_agent = db.Column(db.String(500))
-    viewed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    viewed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     post = db.relationship('Post', backref='view_logs')
 
+    __table_args__ = (
+        # 单篇文章的时间范围统计（按 post_id 过滤）
+        db.Index('ix_view_logs_post_id_viewed_at', 'post_id', 'viewed_at'),
+        # 只按时间范围过滤的查询：趋势图当天未汇总部分（view_stats._daily_counts）、汇总与清理；
+        # 带上 post_id 后按文章分组无需回表（覆盖索引）
+        db.Index('ix_view_logs_viewed_at_post_id', 'viewed_at', 'post_id'),
+    )
+
+
+# ── 阅读统计汇总表 ───────────────────────────────────────────────────────────
+class ViewStatHourly(db.Model):
+    """按小时汇总的阅读量与访客数（由 view_stats.rollup_views 从 view_logs 生成，时间为 UTC）"""
+    __tablename__ = 'view_stats_hourly'
+
+    id = db.Column(db.Integer, primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=False, index=True)
+    hour = db.Column(db.DateTime, nullable=False, index=True)  # 整点
+    views = db.Column(db.Integer, default=0)
+    visitors = db.Column(db.Integer, default=0)  # 同一 IP + UA 视为同一访客
+
+    __table_args__ = (db.UniqueConstraint('post_id', 'hour'),)
+
+
+class ViewStatDaily(db.Model):
+    """按天汇总的阅读量与访客数（UTC 日期）"""
+    __tablename__ = 'view_stats_daily'
+
+    id = db.Column(db.Integer, primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=False, index=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    views = db.Column(db.Integer, default=0)
+    visitors = db.Column(db.Integer, default=0)
+
+    __table_args__ = (db.UniqueConstraint('post_id', 'day'),)
+
+
+class RollupState(db.Model):
+    """汇总进度：name 对应的汇总已覆盖到 watermark（不含）之前的全部日志"""
+    __tablename__ = 'rollup_state'
+
+    name = db.Column(db.String(50), primary_key=True)
+    watermark = db.Column(db.DateTime, nullable=False)
+
 
 # ── 搜索索引表（可选，用于全文搜索）─────────────────────────────────────────
 class SearchIndex(db.Model):
@@ -0,0 +1,224 @@
+"""
+相关文章推荐
+对全部文章的标题、标签、摘要与正文做 TF-IDF（与站内搜索相同的中英文分词），
+稀疏矩阵分块相乘求余弦相似度，为每篇文章预先算好最相近的若干篇，详情页只需一次字典查找
+
+文章变化时只重算变化文章的向量以及近邻列表受影响的文章；变化超过一定比例时全量重建（同时刷新 IDF）
+依赖 NumPy / SciPy，未安装时相关文章功能自动关闭
+"""
+
+import os
+import math
+import logging
+import threading
+from collections import Counter
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+from corpus import corpus
+# 正文纯文本与站内搜索同源：经渲染缓存读取，不占用完整文章的 LRU
+from search_index import tokenize, _load_text
+
+logger = logging.getLogger(__name__)
+
+# 每篇文章保留的相关文章数，设为 0 关闭
+RELATED_K = int(os.environ.get("BLOG_RELATED_K", "5"))
+# 词项过滤：至少出现在 MIN_DF 篇文章中（只出现一次的词不产生相似度），且不超过 MAX_DF 比例
+MIN_DF = 2
+MAX_DF = 0.5
+# 相似度低于该值的文章不作为相关文章
+MIN_SCORE = 0.05
+# 分块相乘的行数，控制稠密相似度块的内存（行数 × 文章数 × 4 字节）
+BLOCK_ROWS = 512
+# 变化文章超过该比例时全量重建
+REBUILD_RATIO = 0.2
+# 标题与标签在向量中的额外权重（计数倍数）
+TITLE_TAG_BOOST = 3
+# 每篇文章只保留 TF-IDF 权重最高的若干词项，矩阵保持稀疏，分块相乘的开销随之下降
+MAX_TERMS = 64
+
+
+def _term_counts(meta: dict, text: str) -> Counter:
+    counts = Counter(tokenize(text))
+    counts.update(tokenize(str(meta["summary"])))
+    boosted = Counter(tokenize(str(meta["title"])))
+    for tag in meta["tags"]:
+        boosted.update(tokenize(str(tag)))
+    for token, n in boosted.items():
+        counts[token] += n * TITLE_TAG_BOOST
+    return counts
+
+
+class RelatedIndex:
+    """
+    related: slug -> ((相关文章 slug, 相似度), ...)，每次更新整体替换，读取无需加锁
+    向量按 slug 保存为 (列号数组, 权重数组)，已做 L2 归一化
+    """
+
+    def __init__(self, k: int = RELATED_K):
+        self.k = k
+        self.version = None
+        self.related = {}
+        self._lock = threading.Lock()
+        self._metas = {}       # slug -> 建索引时的文章元数据（对象身份判断是否变化）
+        self._rows = {}        # slug -> (indices, data)
+        self._vocab = {}       # 词项 -> 列号
+        self._idf = None
+
+    # ── 向量 ──────────────────────────────────────────────────────────────────
+
+    def _vector(self, counts: Counter) -> tuple:
+        vocab = self._vocab
+        pairs = [(vocab[t], tf) for t, tf in counts.items() if t in vocab]
+        indices = np.fromiter((c for c, _ in pairs), dtype=np.int32, count=len(pairs))
+        tfs = np.fromiter((tf for _, tf in pairs), dtype=np.float32, count=len(pairs))
+        data = (1.0 + np.log(tfs)) * self._idf[indices]
+        if len(data) > MAX_TERMS:
+            keep = np.argpartition(-data, MAX_TERMS - 1)[:MAX_TERMS]
+            indices, data = indices[keep], data[keep]
+        norm = float(np.linalg.norm(data)) if len(data) else 0.0
+        if norm:
+            data /= norm
+        order = np.argsort(indices)
+        return indices[order], data[order]
+
+    def _matrix(self, slugs: list):
+        """按给定顺序把行向量拼成 CSR 矩阵"""
+        indptr = np.zeros(len(slugs) + 1, dtype=np.int64)
+        for i, slug in enumerate(slugs):
+            indptr[i + 1] = indptr[i] + len(self._rows[slug][0])
+        indices = np.concatenate([self._rows[s][0] for s in slugs]) if slugs else np.zeros(0, np.int32)
+        data = np.concatenate([self._rows[s][1] for s in slugs]) if slugs else np.zeros(0, np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(slugs), len(self._vocab)))
+
+    def _top_k(self, query_slugs: list, all_slugs: list, matrix_t) -> dict:
+        """分块计算 query_slugs 与全部文章的余弦相似度，取前 k 篇（排除自身）"""
+        position = {slug: i for i, slug in enumerate(all_slugs)}
+        k = min(self.k, len(all_slugs) - 1)
+        result = {}
+        if k <= 0:
+            return {slug: () for slug in query_slugs}
+        for start in range(0, len(query_slugs), BLOCK_ROWS):
+            block = query_slugs[start:start + BLOCK_ROWS]
+            sims = (self._matrix(block) @ matrix_t).toarray()
+            for i, slug in enumerate(block):
+                sims[i, position[slug]] = -1.0
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            for i, slug in enumerate(block):
+                cols = top[i][np.argsort(-sims[i, top[i]], kind="stable")]
+                result[slug] = tuple((all_slugs[j], round(float(sims[i, j]), 4))
+                                     for j in cols if sims[i, j] >= MIN_SCORE)
+        return result
+
+    # ── 构建 ──────────────────────────────────────────────────────────────────
+
+    def refresh(self, posts: list, version: int, load_text=_load_text):
+        """与语料同步：首次或变化较多时全量重建，否则增量更新"""
+        if version == self.version:
+            return
+        with self._lock:
+            if version == self.version:
+                return
+            current = {p["slug"]: p for p in posts}
+            changed = [s for s, meta in current.items() if self._metas.get(s) is not meta]
+            removed = [s for s in self._metas if s not in current]
+            if self._idf is None or len(changed) + len(removed) > REBUILD_RATIO * max(len(current), 1):
+                self._rebuild(current, load_text)
+            elif changed or removed:
+                self._update(current, changed, removed, load_text)
+            self.version = version
+
+    def _rebuild(self, current: dict, load_text):
+        slugs = list(current)
+        counts = {slug: _term_counts(meta, load_text(meta)) for slug, meta in current.items()}
+        df = Counter()
+        for c in counts.values():
+            df.update(c.keys())
+        n = len(slugs)
+        max_df = max(MIN_DF, MAX_DF * n)
+        vocab = sorted(t for t, f in df.items() if MIN_DF <= f <= max_df)
+        self._vocab = {t: i for i, t in enumerate(vocab)}
+        self._idf = np.asarray([math.log((1 + n) / (1 + df[t])) + 1.0 for t in vocab], dtype=np.float32)
+        self._rows = {slug: self._vector(counts[slug]) for slug in slugs}
+        self._metas = dict(current)
+        matrix_t = self._matrix(slugs).T.tocsr()
+        self.related = self._top_k(slugs, slugs, matrix_t)
+
+    def _update(self, current: dict, changed: list, removed: list, load_text):
+        """IDF 沿用上次全量构建的结果，新出现的词项在下次重建时才计入"""
+        for slug in removed:
+            self._rows.pop(slug, None)
+            self._metas.pop(slug, None)
+        for slug in changed:
+            meta = current[slug]
+            self._rows[slug] = self._vector(_term_counts(meta, load_text(meta)))
+            self._metas[slug] = meta
+
+        slugs = list(self._rows)
+        matrix_t = self._matrix(slugs).T.tocsr()
+        related = {s: r for s, r in self.related.items() if s in self._rows}
+
+        # 需要重算的文章：近邻中含有变化 / 删除文章的，以及变化文章的相似度能挤进其前 k 的
+        stale = set(changed) | set(removed)
+        affected = {s for s, r in related.items() if any(other in stale for other, _ in r)}
+        if changed:
+            sims = (self._matrix(changed) @ matrix_t).toarray().max(axis=0)
+            for j, slug in enumerate(slugs):
+                r = related.get(slug, ())
+                floor = r[-1][1] if len(r) >= self.k else MIN_SCORE
+                if sims[j] > floor:
+                    affected.add(slug)
+        affected |= set(changed)
+        related.update(self._top_k(sorted(affected), slugs, matrix_t))
+        self.related = related
+
+
+related_index = RelatedIndex() if np is not None and RELATED_K > 0 else None
+
+_refresh_lock = threading.Lock()
+
+
+def refresh_related():
+    """同步刷新相关文章（静态导出等需要完整结果的场景）"""
+    if related_index is None:
+        return
+    if not corpus.watched:
+        corpus.refresh()
+    related_index.refresh(corpus.listing(), corpus.version)
+
+
+def _schedule_refresh():
+    """后台单线程刷新，进行中再次触发时直接返回，结束后若语料又变化则继续"""
+    if not _refresh_lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            while related_index.version != corpus.version:
+                try:
+                    refresh_related()
+                except Exception:
+                    logger.exception("相关文章计算失败")
+                    return
+        finally:
+            _refresh_lock.release()
+
+    threading.Thread(target=run, name="related", daemon=True).start()
+
+
+def get_related(slug: str) -> list:
+    """某篇文章的相关文章元数据列表；结果落后于语料时在后台刷新，本次先返回已有结果"""
+    if related_index is None:
+        return []
+    if related_index.version != corpus.version:
+        _schedule_refresh()
+    posts = []
+    for other, _ in related_index.related.get(slug, ()):
+        meta = corpus.get(other)
+        if meta is not None:
+            posts.append(meta)
+    return posts
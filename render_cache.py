@@ -0,0 +1,128 @@
+"""
+Markdown 渲染结果的持久化缓存
+以 SHA-256(原始文件内容 + 扩展配置 + 库版本) 为键，保存 HTML、TOC、front matter 与纯文本
+各 worker、sync_db.py、migrate_to_db.py 共享同一个缓存文件，重启后无需重新渲染
+"""
+
+import os
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+
+import markdown
+import pygments
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "cache", "render.db")
+
+# 访问时间的刷新粒度（秒），避免每次命中都产生写操作
+TOUCH_INTERVAL = 3600
+# 每写入多少条记录检查一次总大小
+EVICT_CHECK_EVERY = 50
+
+
+class RenderCache:
+    """基于 SQLite 的内容寻址缓存，超过 max_bytes 时按最近访问时间淘汰"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._puts = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        # 按线程 + 进程各自持有连接（进程池 fork 出的子进程不能复用父进程连接）
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS renders ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_renders_accessed ON renders (accessed_at)")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> dict | None:
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, accessed_at FROM renders WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > TOUCH_INTERVAL:
+                conn.execute("UPDATE renders SET accessed_at = ? WHERE key = ?", (now, key))
+            return pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError) as e:
+            logger.warning("读取渲染缓存失败: %s", e)
+            return None
+
+    def put(self, key: str, record: dict):
+        try:
+            value = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO renders (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            self._puts += 1
+            if self._puts % EVICT_CHECK_EVERY == 0:
+                self.evict()
+        except sqlite3.Error as e:
+            logger.warning("写入渲染缓存失败: %s", e)
+
+    def evict(self):
+        """总大小超过上限时，删除最久未访问的记录直到降至上限的 90%"""
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM renders").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM renders ORDER BY accessed_at"):
+            if total - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM renders WHERE key = ?", doomed)
+        logger.info("渲染缓存淘汰 %d 条记录，释放 %d 字节", len(doomed), freed)
+
+    def clear(self):
+        self._conn().execute("DELETE FROM renders")
+
+
+def make_key(raw: str, extensions: list, extension_configs: dict) -> str:
+    """缓存键：原始内容 + 扩展配置 + markdown/pygments 版本，任一变化都会失效"""
+    h = hashlib.sha256()
+    h.update(raw.encode("utf-8"))
+    h.update(b"\0")
+    h.update(json.dumps([extensions, extension_configs], sort_keys=True).encode())
+    h.update(f"\0{markdown.__version__}\0{pygments.__version__}".encode())
+    return h.hexdigest()
+
+
+def _create_default() -> RenderCache | None:
+    path = os.environ.get("BLOG_RENDER_CACHE", DEFAULT_PATH)
+    if path.lower() == "off":
+        return None
+    max_mb = float(os.environ.get("BLOG_RENDER_CACHE_MB", "200"))
+    return RenderCache(path, int(max_mb * 1024 * 1024))
+
+
+render_cache = _create_default()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+阅读统计汇总 + 原始日志清理
+把 view_logs 汇总到按小时 / 按天的统计表，并删除超过保留期的原始日志
+建议每小时由 cron 执行一次（crawlers/run.sh 每次抓取后也会执行）
+"""
+
+import os
+import sys
+import argparse
+
+def main():
+    parser = argparse.ArgumentParser(description="汇总阅读日志并清理过期记录")
+    parser.add_argument("--retention-days", type=int, default=None,
+                        help="原始日志保留天数，默认取环境变量 BLOG_VIEWLOG_RETENTION_DAYS 或 30")
+    parser.add_argument("--no-prune", action="store_true", help="只汇总，不删除原始日志")
+    args = parser.parse_args()
+
+    # 命令行任务不需要常驻监听
+    os.environ.setdefault("BLOG_WATCH", "off")
+
+    try:
+        from app import app
+        from view_stats import rollup_views, prune_view_logs, RETENTION_DAYS
+
+        with app.app_context():
+            stats = rollup_views()
+            print(f"✓ 汇总完成：小时 {stats['hourly']} 行，按天 {stats['daily']} 行")
+            if not args.no_prune:
+                days = args.retention_days if args.retention_days is not None else RETENTION_DAYS
+                pruned = prune_view_logs(days)
+                print(f"✓ 清理完成：原始日志 {pruned['view_logs']} 行，小时汇总 {pruned['hourly']} 行")
+
+    except Exception as e:
+        print(f"✗ 汇总失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
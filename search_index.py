@@ -0,0 +1,623 @@
+"""
+站内搜索倒排索引
+英文按单词切分，中文按相邻二字（bigram）切分，按字段记录词项位置
+查询时对各词项的倒排表求交集并校验位置连续（短语匹配），沿用原有字段权重：
+标题 100、摘要 50、标签 40、分类 30、正文 20，标题完全一致额外 +50，每次出现 +5
+
+正文额外保存纯文本与每个词项的字符起点，摘录片段直接由命中位置换算，不再重新扫描全文
+另有查询结果 LRU（语料版本变化即失效）和标题 / 标签前缀树，供搜索框自动补全使用
+"""
+
+import os
+import re
+import html
+import json
+import heapq
+import base64
+import bisect
+import threading
+from datetime import datetime
+from array import array
+from collections import OrderedDict
+
+from corpus import corpus, post_sort_key, load_text
+
+FIELD_WEIGHTS = {"title": 100, "summary": 50, "tags": 40, "category": 30, "content": 20}
+EXACT_TITLE_BONUS = 50
+OCCURRENCE_WEIGHT = 5
+# 最后一个英文词按前缀匹配（边输入边搜索），最多展开的词项数
+PREFIX_EXPANSION_LIMIT = 64
+# 查询结果缓存条数，0 表示关闭
+RESULT_CACHE_SIZE = int(os.environ.get("BLOG_SEARCH_CACHE_SIZE", "256"))
+# 自动补全：每个前缀保留的候选数、前缀树最大深度（字符数）
+SUGGEST_LIMIT = 8
+# 搜索结果摘录：单个窗口的字符数、每条结果最多的窗口数
+SNIPPET_WIDTH = 150
+SNIPPET_WINDOWS = 3
+SUGGEST_MAX_DEPTH = 16
+# FTS 后端的分页游标为结果偏移量，翻页深度上限（也避免超出 SQLite 整数范围）
+MAX_SEARCH_OFFSET = 10000
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[\u3400-\u4dbf\u4e00-\u9fff]+")
+# 从词项起点找回词项终点：英文整词，中文 bigram（最后一个字为单字）
+_SPAN_RE = re.compile(r"[a-z0-9]+|[\u3400-\u4dbf\u4e00-\u9fff]{1,2}", re.IGNORECASE)
+
+
+def _lowered(text: str) -> str:
+    """小写形式，保证与原文逐字符对齐（个别字符小写后会变长，此时逐字取首字符）"""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = "".join(ch.lower()[0] for ch in text)
+    return lowered
+
+
+def tokenize_spans(text: str) -> list:
+    """切分为 (词项, 在原文中的字符起点) 序列：英文 / 数字为整词，连续汉字切成 bigram，单个汉字保留为一元词"""
+    spans = []
+    for m in _TOKEN_RE.finditer(_lowered(text or "")):
+        run, base = m.group(), m.start()
+        if run[0] < "\u0080" or len(run) == 1:
+            spans.append((run, base))
+        else:
+            spans.extend((run[i:i + 2], base + i) for i in range(len(run) - 1))
+    return spans
+
+
+def tokenize(text: str) -> list:
+    """与 tokenize_spans 相同的切分，只返回词项（不需要位置时更快）"""
+    tokens = []
+    for run in _TOKEN_RE.findall(_lowered(text or "")):
+        if run[0] < "\u0080" or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(map("".join, zip(run, run[1:])))
+    return tokens
+
+
+def _is_cjk(token: str) -> bool:
+    return token[0] >= "\u3400"
+
+
+class InvertedIndex:
+    """
+    postings: 词项 -> {文档 id -> {字段 -> [位置, ...]}}
+    与语料库按版本号同步：只为新增 / 变化的文章建索引，删除已消失的文章
+    """
+
+    def __init__(self):
+        self.version = None
+        # _lock 保护索引数据（查询与写入），_sync_lock 保证同时只有一个线程在建索引
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._postings = {}
+        self._docs = {}          # 文档 id -> 文章元数据
+        self._doc_terms = {}     # 文档 id -> 该文档出现过的词项（删除时使用）
+        self._doc_titles = {}    # 文档 id -> 小写标题（判断完全匹配）
+        self._texts = {}         # 文档 id -> 正文纯文本
+        self._offsets = {}       # 文档 id -> 正文各词项的字符起点 array('I')
+        self._doc_dates = {}     # 文档 id -> 排序用发布时间
+        self._by_category = {}   # 分类 -> {文档 id}，过滤在打分前进行
+        self._by_tag = {}        # 标签 -> {文档 id}
+        self._slug_ids = {}      # slug -> 文档 id
+        self._next_id = 0
+        # 单个汉字 -> 以该字开头 / 结尾的 bigram，用于单字查询
+        self._cjk_first = {}
+        self._cjk_last = {}
+        self._vocab = []         # 排序后的英文词表，用于前缀展开
+        self._vocab_dirty = False
+
+    # ── 建索引 ────────────────────────────────────────────────────────────────
+
+    def sync(self, posts: list, version: int, load_text) -> bool:
+        """
+        与语料列表同步；corpus 在文件变化时会替换文章 dict，
+        因此用对象身份即可判断文章是否变化，无需比较内容
+        load_text(meta) 返回正文纯文本
+        读取正文与分词在查询锁之外进行，最后持锁一次性替换，建索引期间查询照常使用旧索引；
+        已有索引时若其他线程正在同步，直接返回（本次查询使用旧索引），只有首次建索引需要等待
+        返回索引是否已与 version 一致
+        """
+        if version == self.version:
+            return True
+        if not self._sync_lock.acquire(blocking=self.version is None):
+            return False
+        try:
+            if version == self.version:
+                return True
+            # 只有持有 _sync_lock 的线程会修改索引，这里读取无需查询锁
+            current = {p["slug"]: p for p in posts}
+            stale = [doc_id for slug, doc_id in self._slug_ids.items()
+                     if current.get(slug) is not self._docs[doc_id]]
+            stale_slugs = {self._docs[doc_id]["slug"] for doc_id in stale}
+            prepared = [(meta, self._prepare(meta, load_text(meta))) for slug, meta in current.items()
+                        if slug not in self._slug_ids or slug in stale_slugs]
+            with self._lock:
+                for doc_id in stale:
+                    self._remove(doc_id)
+                for meta, fields in prepared:
+                    self._add(meta, fields)
+                self.version = version
+            return True
+        finally:
+            self._sync_lock.release()
+
+    def _fields(self, meta: dict, text: str) -> dict:
+        return {
+            "title": meta["title"],
+            "summary": meta["summary"],
+            "tags": " ".join(str(t) for t in meta["tags"]),
+            "category": meta["category"],
+            "content": text,
+        }
+
+    def _prepare(self, meta: dict, text: str) -> list:
+        """分词（不触及索引数据，可在锁外进行）：[(字段, 原文, [(词项, 字符起点), ...]), ...]"""
+        return [(field, str(value), tokenize_spans(str(value)))
+                for field, value in self._fields(meta, text).items()]
+
+    def _add(self, meta: dict, fields: list):
+        doc_id = self._next_id
+        self._next_id += 1
+        terms = set()
+        for field, value, spans in fields:
+            if field == "content":
+                self._texts[doc_id] = value
+                self._offsets[doc_id] = array("I", [start for _, start in spans])
+            for pos, (token, _) in enumerate(spans):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    if _is_cjk(token):
+                        if len(token) == 2:
+                            self._cjk_first.setdefault(token[0], set()).add(token)
+                            self._cjk_last.setdefault(token[1], set()).add(token)
+                    else:
+                        self._vocab_dirty = True
+                postings.setdefault(doc_id, {}).setdefault(field, []).append(pos)
+                terms.add(token)
+        self._docs[doc_id] = meta
+        self._doc_terms[doc_id] = terms
+        self._doc_titles[doc_id] = str(meta["title"]).lower()
+        self._doc_dates[doc_id] = post_sort_key(meta)
+        self._by_category.setdefault(str(meta["category"]), set()).add(doc_id)
+        for tag in meta["tags"]:
+            self._by_tag.setdefault(str(tag), set()).add(doc_id)
+        self._slug_ids[meta["slug"]] = doc_id
+
+    def _remove(self, doc_id: int):
+        for token in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                if not _is_cjk(token):
+                    self._vocab_dirty = True
+        meta = self._docs.pop(doc_id)
+        self._doc_titles.pop(doc_id, None)
+        self._doc_dates.pop(doc_id, None)
+        for group, key in [(self._by_category, str(meta["category"]))] + \
+                [(self._by_tag, str(tag)) for tag in meta["tags"]]:
+            ids = group.get(key)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del group[key]
+        self._texts.pop(doc_id, None)
+        self._offsets.pop(doc_id, None)
+        self._slug_ids.pop(meta["slug"], None)
+
+    # ── 查询 ──────────────────────────────────────────────────────────────────
+
+    def _alternatives(self, token: str, is_last: bool, single: bool) -> set:
+        """查询词项可匹配的索引词项集合"""
+        alts = {token} if token in self._postings else set()
+        if _is_cjk(token):
+            if len(token) == 1:
+                alts |= self._cjk_first.get(token, set())
+                if single:
+                    alts |= self._cjk_last.get(token, set())
+        elif is_last:
+            if self._vocab_dirty:
+                self._vocab = sorted(t for t in self._postings if not _is_cjk(t))
+                self._vocab_dirty = False
+            i = bisect.bisect_left(self._vocab, token)
+            while i < len(self._vocab) and self._vocab[i].startswith(token) \
+                    and len(alts) < PREFIX_EXPANSION_LIMIT:
+                alts.add(self._vocab[i])
+                i += 1
+        return alts
+
+    def _candidates(self, token_alts: list) -> set:
+        doc_sets = []
+        for alts in token_alts:
+            docs = set()
+            for alt in alts:
+                docs.update(self._postings[alt])
+            doc_sets.append(docs)
+        doc_sets.sort(key=len)
+        result = doc_sets[0]
+        for docs in doc_sets[1:]:
+            result = result & docs
+            if not result:
+                break
+        return result
+
+    def _positions(self, alts: set, doc_id: int, field: str) -> set:
+        positions = set()
+        for alt in alts:
+            positions.update(self._postings[alt].get(doc_id, {}).get(field, ()))
+        return positions
+
+    def _phrase_starts(self, token_alts: list, doc_id: int, field: str) -> set:
+        """字段中查询词项按顺序连续出现的起始词项位置"""
+        starts = self._positions(token_alts[0], doc_id, field)
+        for offset, alts in enumerate(token_alts[1:], 1):
+            if not starts:
+                break
+            positions = self._positions(alts, doc_id, field)
+            starts = {p for p in starts if p + offset in positions}
+        return starts
+
+    def _phrase_count(self, token_alts: list, doc_id: int, field: str) -> int:
+        return len(self._phrase_starts(token_alts, doc_id, field))
+
+    def _query_alts(self, q_tokens: list) -> list | None:
+        single = len(q_tokens) == 1
+        token_alts = [self._alternatives(t, i == len(q_tokens) - 1, single)
+                      for i, t in enumerate(q_tokens)]
+        if any(not alts for alts in token_alts):
+            return None
+        return token_alts
+
+    def _filter(self, candidates: set, filters: dict | None) -> set:
+        """按分类 / 标签 / 日期范围缩小候选集合（date_to 不含）"""
+        if not filters:
+            return candidates
+        category, tag = filters.get("category"), filters.get("tag")
+        if category is not None:
+            candidates = candidates & self._by_category.get(str(category), set())
+        if tag is not None:
+            candidates = candidates & self._by_tag.get(str(tag), set())
+        date_from, date_to = filters.get("date_from"), filters.get("date_to")
+        if date_from is not None or date_to is not None:
+            lo = date_from or datetime.min
+            hi = date_to or datetime.max
+            candidates = {d for d in candidates if lo <= self._doc_dates[d] < hi}
+        return candidates
+
+    def _score(self, doc_id: int, token_alts: list, q_lower: str) -> int:
+        score = 0
+        occurrences = 0
+        for field, weight in FIELD_WEIGHTS.items():
+            count = self._phrase_count(token_alts, doc_id, field)
+            if count:
+                score += weight
+                occurrences += count
+        if not score:
+            return 0
+        if self._doc_titles[doc_id] == q_lower:
+            score += EXACT_TITLE_BONUS
+        return score + occurrences * OCCURRENCE_WEIGHT
+
+    def search(self, query: str, limit: int = None, filters: dict = None, after: tuple = None) -> list:
+        """
+        返回 [(分数, 文章元数据), ...]，按分数倒序，同分按发布时间倒序
+        limit: 只取前 limit 条（堆选择，不对全部命中排序）
+        filters: {"category", "tag", "date_from", "date_to"}，在打分前从索引过滤
+        after: 上一页最后一条的排序键（见 result_key），只返回排在它之后的结果
+        """
+        q_tokens = tokenize(query)
+        if not q_tokens:
+            return []
+        q_lower = query.strip().lower()
+
+        with self._lock:
+            token_alts = self._query_alts(q_tokens)
+            if token_alts is None:
+                return []
+
+            results = []
+            for doc_id in self._filter(self._candidates(token_alts), filters):
+                score = self._score(doc_id, token_alts, q_lower)
+                if not score:
+                    continue
+                result = (score, self._docs[doc_id])
+                if after is not None and result_key(result) >= after:
+                    continue
+                results.append(result)
+
+        if limit is not None and limit < len(results):
+            return heapq.nlargest(limit, results, key=result_key)
+        results.sort(key=result_key, reverse=True)
+        return results
+
+    # ── 摘录 ──────────────────────────────────────────────────────────────────
+
+    def _match_spans(self, doc_id: int, q_tokens: list, token_alts: list) -> list:
+        """正文中短语命中的字符区间 [(起, 止), ...]，由词项位置与字符起点换算"""
+        text = self._texts[doc_id]
+        offsets = self._offsets[doc_id]
+        last = len(q_tokens) - 1
+        spans = []
+        for pos in sorted(self._phrase_starts(token_alts, doc_id, "content")):
+            start = offsets[pos]
+            end_start = offsets[pos + last]
+            m = _SPAN_RE.match(text, end_start)
+            end = m.end() if m else end_start + 1
+            if len(q_tokens) == 1 and len(q_tokens[0]) == 1 and _is_cjk(q_tokens[0]):
+                # 单字查询经 bigram 命中，只高亮该字本身
+                start = start if text[start].lower() == q_tokens[0] else end - 1
+                end = start + 1
+            spans.append((start, end))
+        return spans
+
+    def snippets(self, slug: str, query: str, width: int = SNIPPET_WIDTH,
+                 max_windows: int = SNIPPET_WINDOWS) -> list:
+        """
+        正文摘录：返回 [(片段文本, [(高亮起, 高亮止), ...], 前有省略, 后有省略), ...]
+        相距较近的命中并入同一窗口，最多 max_windows 个窗口；正文无命中时返回开头一段
+        """
+        q_tokens = tokenize(query)
+        with self._lock:
+            doc_id = self._slug_ids.get(slug)
+            if doc_id is None:
+                return []
+            text = self._texts[doc_id]
+            token_alts = self._query_alts(q_tokens) if q_tokens else None
+            spans = self._match_spans(doc_id, q_tokens, token_alts) if token_alts else []
+
+        if not text:
+            return []
+        if not spans:
+            return [(text[:width], [], False, len(text) > width)]
+
+        windows = []   # [起, 止, [高亮区间]]
+        used = 0       # 已占用的窗口额度（与前一窗口首尾相接时合并，但仍计一次）
+        for start, end in spans:
+            if windows and start < windows[-1][1]:
+                win = windows[-1]
+                win[1] = max(win[1], min(len(text), end))
+                win[2].append((start, end))
+                continue
+            if used == max_windows:
+                break
+            used += 1
+            win_start = max(0, start - width // 3)
+            win_end = min(len(text), max(win_start + width, end))
+            if windows and win_start <= windows[-1][1]:
+                windows[-1][1] = win_end
+                windows[-1][2].append((start, end))
+                continue
+            windows.append([win_start, win_end, [(start, end)]])
+
+        return [(text[s:e], [(hs - s, min(he, e) - s) for hs, he in marks], s > 0, e < len(text))
+                for s, e, marks in windows]
+
+
+def result_key(result: tuple) -> tuple:
+    """结果排序键：(分数, 发布时间, slug)，倒序排列"""
+    score, meta = result
+    return score, post_sort_key(meta), meta["slug"]
+
+
+# ── 分页游标 ──────────────────────────────────────────────────────────────────
+
+def encode_cursor(value) -> str:
+    """把可 JSON 序列化的位置信息编码成不透明的游标字符串"""
+    raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """解码游标，非法游标返回 None（按第一页处理）"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def cursor_for(result: tuple) -> str:
+    score, published, slug = result_key(result)
+    return encode_cursor([score, published.isoformat(), slug])
+
+
+def cursor_key(cursor: str) -> tuple | None:
+    """游标 -> result_key 形式的排序键；类型不符（被篡改）的游标返回 None，按第一页处理"""
+    value = decode_cursor(cursor)
+    if not isinstance(value, list) or len(value) != 3:
+        return None
+    score, published, slug = value
+    if isinstance(score, bool) or not isinstance(score, (int, float)) \
+            or not isinstance(published, str) or not isinstance(slug, str):
+        return None
+    try:
+        published = datetime.fromisoformat(published)
+    except ValueError:
+        return None
+    # 排序键中的发布时间均为 naive datetime，带时区的无法比较
+    if published.tzinfo is not None:
+        return None
+    return score, published, slug
+
+
+def cursor_offset(cursor: str) -> int:
+    """FTS 后端的偏移量游标；非整数、负数或超过 MAX_SEARCH_OFFSET（被篡改）的游标按第一页处理"""
+    value = decode_cursor(cursor)
+    if type(value) is not int or not 0 < value <= MAX_SEARCH_OFFSET:
+        return 0
+    return value
+
+
+# ── 查询结果缓存 ──────────────────────────────────────────────────────────────
+
+class ResultCache:
+    """(规范化查询, 分页与过滤参数) -> 排序后的结果；版本号与语料不一致时整体清空"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: int, key):
+        with self._lock:
+            if version != self.version:
+                self._data.clear()
+                self.version = version
+            results = self._data.get(key)
+            if results is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def put(self, version: int, key, results: list):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            self._data[key] = results
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+# ── 自动补全前缀树 ────────────────────────────────────────────────────────────
+
+_WORD_START_RE = re.compile(r"(?<![a-z0-9])[a-z0-9]|[\u3400-\u4dbf\u4e00-\u9fff]")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+class _TrieNode:
+    __slots__ = ("children", "items")
+
+    def __init__(self):
+        self.children = {}
+        self.items = []
+
+
+class PrefixTrie:
+    """
+    标题从每个英文单词开头、每个汉字处起插入（最多 SUGGEST_MAX_DEPTH 个字符），标签整体插入
+    每个节点只保留前 SUGGEST_LIMIT 篇文章；按发布时间倒序插入，因此候选即为最新的匹配文章
+    """
+
+    def __init__(self, posts: list, version: int):
+        self.version = version
+        self.root = _TrieNode()
+        for meta in posts:
+            title = _normalize(meta["title"])
+            starts = {m.start() for m in _WORD_START_RE.finditer(title)}
+            for start in sorted(starts):
+                self._insert(title[start:start + SUGGEST_MAX_DEPTH], meta)
+            for tag in meta["tags"]:
+                self._insert(_normalize(tag)[:SUGGEST_MAX_DEPTH], meta)
+
+    def _insert(self, key: str, meta: dict):
+        node = self.root
+        for ch in key:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _TrieNode()
+            node = child
+            items = node.items
+            # 同一篇文章的所有键连续插入，已收录时它必然是最后一个
+            if len(items) < SUGGEST_LIMIT and (not items or items[-1] is not meta):
+                items.append(meta)
+
+    def suggest(self, prefix: str, limit: int = SUGGEST_LIMIT) -> list:
+        node = self.root
+        for ch in _normalize(prefix)[:SUGGEST_MAX_DEPTH]:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return node.items[:limit]
+
+
+search_index = InvertedIndex()
+
+
+def _load_text(meta: dict) -> str:
+    """正文纯文本：clean_html 只去标签，这里再还原实体，供索引与摘录使用"""
+    text = load_text(meta)
+    return html.unescape(text) if text else ""
+
+
+result_cache = ResultCache(RESULT_CACHE_SIZE)
+_trie = None
+_trie_lock = threading.Lock()
+
+
+def format_snippets(windows: list) -> tuple:
+    """摘录窗口 -> (纯文本, 带 <mark> 高亮的安全 HTML)，窗口之间以省略号连接"""
+    plain, marked = [], []
+    for text, marks, head, tail in windows:
+        parts, cursor = [], 0
+        for start, end in marks:
+            if start < cursor:
+                continue
+            parts.append(html.escape(text[cursor:start]))
+            parts.append("<mark>" + html.escape(text[start:end]) + "</mark>")
+            cursor = end
+        parts.append(html.escape(text[cursor:]))
+        text_html = "".join(parts).strip()
+        text = text.strip()
+        if head:
+            text, text_html = "..." + text, "..." + text_html
+        if tail:
+            text, text_html = text + "...", text_html + "..."
+        plain.append(text)
+        marked.append(text_html)
+    return " ".join(plain), " ".join(marked)
+
+
+def search_snippets(meta: dict, query: str) -> tuple:
+    """某条搜索结果的正文摘录，返回 (纯文本, 高亮 HTML)"""
+    return format_snippets(search_index.snippets(meta["slug"], query))
+
+
+def search_posts(query: str, limit: int = None, filters: dict = None, after: tuple = None) -> list:
+    """
+    在当前语料上搜索，索引落后于语料版本时先增量同步；同一版本内相同请求直接命中缓存
+    参数含义见 InvertedIndex.search
+    """
+    if not corpus.watched:
+        corpus.refresh()
+    # 先取版本号再取列表：即使中间语料又变化，下次查询也会再同步
+    version = corpus.version
+    key = (_normalize(query), limit, tuple(sorted((filters or {}).items())), after)
+    results = result_cache.get(version, key)
+    if results is None:
+        synced = search_index.sync(corpus.listing(), version, _load_text)
+        results = search_index.search(query, limit, filters, after)
+        # 其他线程仍在建索引时本次结果来自旧索引，不以新版本号缓存
+        if synced:
+            result_cache.put(version, key, results)
+    return results
+
+
+def suggest_posts(prefix: str, limit: int = SUGGEST_LIMIT) -> list:
+    """标题 / 标签前缀补全，返回文章元数据列表（最新在前）"""
+    global _trie
+    if not corpus.watched:
+        corpus.refresh()
+    version = corpus.version
+    trie = _trie
+    if trie is None or trie.version != version:
+        with _trie_lock:
+            trie = _trie
+            if trie is None or trie.version != version:
+                trie = _trie = PrefixTrie(corpus.listing(), version)
+    return trie.suggest(prefix, limit)
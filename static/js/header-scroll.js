@@ -63,5 +63,10 @@
       desktopInput.value = mobileInput.value;
       desktopInput.dispatchEvent(new Event('input'));
     });
+    mobileInput.addEventListener('keydown', function(e) {
+      if (e.key === 'Enter') {
+        desktopInput.dispatchEvent(new KeyboardEvent('keydown', { key: 'Enter' }));
+      }
+    });
   }
 })();
@@ -1,30 +1,63 @@
-// 前端搜索：调用 /blog/search?q= 接口，实时显示结果
+// 前端搜索：输入时调用 /blog/search/suggest 做标题 / 标签补全，
+// 回车或补全无结果时再调用 /blog/search?q= 做全文搜索
 (function () {
   const input = document.getElementById("search-input");
   const resultsBox = document.getElementById("search-results");
   if (!input || !resultsBox) return;
 
   let timer = null;
+  let seq = 0;
 
   input.addEventListener("input", function () {
     clearTimeout(timer);
     const q = this.value.trim();
 
     if (!q) {
+      seq++;
       resultsBox.style.display = "none";
       resultsBox.innerHTML = "";
       return;
     }
 
-    // 防抖 300ms
-    timer = setTimeout(() => {
-      fetch(`/blog/search?q=${encodeURIComponent(q)}`)
-        .then((r) => r.json())
-        .then((data) => renderResults(data, q))
-        .catch(() => {});
-    }, 300);
+    // 防抖 150ms，补全接口只返回 slug / 标题 / 分类
+    timer = setTimeout(() => suggest(q), 150);
   });
 
+  function suggest(q) {
+    const id = ++seq;
+    fetch(`/blog/search/suggest?q=${encodeURIComponent(q)}`)
+      .then((r) => r.json())
+      .then((data) => {
+        if (id !== seq) return;
+        if (data.length) renderSuggestions(data, q);
+        else fullSearch(q);
+      })
+      .catch(() => {});
+  }
+
+  function fullSearch(q) {
+    const id = ++seq;
+    fetch(`/blog/search?q=${encodeURIComponent(q)}`)
+      .then((r) => r.json())
+      .then((data) => {
+        if (id === seq) renderResults(data.results, q);
+      })
+      .catch(() => {});
+  }
+
+  function renderSuggestions(items, q) {
+    resultsBox.innerHTML = items
+      .map(
+        (p) => `
+      <div class="result-item">
+        <a href="/blog/${escHtml(p.slug)}">${highlight(p.title, q)}</a>
+        <div class="result-meta"><span class="category-badge">${escHtml(p.category)}</span></div>
+      </div>`
+      )
+      .join("");
+    resultsBox.style.display = "block";
+  }
+
   function renderResults(posts, q) {
     if (!posts.length) {
       resultsBox.innerHTML = `<div class="no-result">没有找到"${escHtml(q)}"相关文章</div>`;
@@ -43,7 +76,9 @@
           <span class="category-badge">${escHtml(p.category)}</span>
           ${p.tags.slice(0, 3).map((t) => `<span class="tag">#${escHtml(t)}</span>`).join(" ")}
         </div>
-        ${p.match_context ? `<div class="result-context">${highlight(p.match_context, q)}</div>` : ""}
+        ${p.match_html
+          ? `<div class="result-context">${p.match_html}</div>`
+          : p.match_context ? `<div class="result-context">${highlight(p.match_context, q)}</div>` : ""}
       </div>`
       )
       .join("");
@@ -70,9 +105,14 @@
     }
   });
 
-  // ESC 关闭
+  // 回车全文搜索，ESC 关闭
   input.addEventListener("keydown", function (e) {
-    if (e.key === "Escape") {
+    if (e.key === "Enter") {
+      e.preventDefault();
+      clearTimeout(timer);
+      const q = input.value.trim();
+      if (q) fullSearch(q);
+    } else if (e.key === "Escape") {
       resultsBox.style.display = "none";
       input.blur();
     }
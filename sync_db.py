@@ -6,8 +6,21 @@
 
 import os
 import sys
+import argparse
 
 def main():
+    parser = argparse.ArgumentParser(description="同步 MD 文件到数据库")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="并行渲染的进程数，默认取环境变量 BLOG_BUILD_WORKERS 或 CPU 核数")
+    parser.add_argument("--full", action="store_true",
+                        help="忽略文件戳与内容哈希，重新写入全部文章")
+    parser.add_argument("--allow-delete", action="store_true",
+                        help="即使待删除的文章过多（或未扫描到任何文件）也删除文件已不存在的文章")
+    args = parser.parse_args()
+
+    # 命令行任务不需要常驻监听
+    os.environ.setdefault("BLOG_WATCH", "off")
+
     print("快速同步数据库...")
 
     try:
@@ -18,7 +31,8 @@ def main():
 
         with app.app_context():
             # 同步文章
-            sync_posts_from_files(POSTS_DIR)
+            sync_posts_from_files(POSTS_DIR, workers=args.workers, full=args.full,
+                                  allow_delete=args.allow_delete)
             print("✓ 同步完成")
 
     except Exception as e:
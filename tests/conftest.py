@@ -0,0 +1,43 @@
+"""
+测试环境：app 等模块在导入时读取环境变量，这里在任何测试导入它们之前
+把文章目录、数据库、渲染缓存与任务状态指向一个临时目录，并写入几篇测试文章
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SANDBOX = tempfile.mkdtemp(prefix="blog-tests-")
+POSTS_DIR = os.path.join(SANDBOX, "posts")
+
+os.environ.update({
+    "BLOG_POSTS_DIR": POSTS_DIR,
+    "DATABASE_URL": f"sqlite:///{os.path.join(SANDBOX, 'blog.db')}",
+    "BLOG_RENDER_CACHE": os.path.join(SANDBOX, "render.db"),
+    "BLOG_JOB_DIR": os.path.join(SANDBOX, "jobs"),
+    "BLOG_WATCH": "off",
+    "BLOG_RELATED_K": "0",
+    "BLOG_BUILD_WORKERS": "1",
+    "FLASK_SECRET_KEY": "test",
+})
+
+
+def write_post(rel_path: str, title: str, date: str, tags: list, body: str = "正文") -> str:
+    path = os.path.join(POSTS_DIR, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"---\ntitle: {title}\ndate: {date}\ntags: {tags!r}\nsummary: {title}\n---\n\n{body}\n")
+    return path
+
+
+write_post("tech/2026-01-01-csharp.md", "C# 入门", "2026-01-01 10:00", ["C#", "a?b", "50%", "编程"])
+write_post("tech/2026-01-02-python.md", "Python 入门", "2026-01-02 10:00", ["编程"])
+write_post("ai/2026-01-03-llm.md", "大模型 简报", "2026-01-03 10:00", ["ai"], "大模型 发布")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(SANDBOX, ignore_errors=True)
@@ -0,0 +1,19 @@
+"""语料缓存：服务进程中的 refresh 即使待解析文件很多也不启动进程池"""
+
+import corpus as corpus_module
+from corpus import PostCorpus, PARALLEL_THRESHOLD
+
+
+def test_refresh_is_serial(tmp_path, monkeypatch):
+    for i in range(PARALLEL_THRESHOLD + 10):
+        (tmp_path / f"post-{i}.md").write_text(f"---\ntitle: T{i}\ndate: 2026-01-01\n---\n\nx\n",
+                                               encoding="utf-8")
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("refresh 不应在服务进程中启动进程池")
+
+    monkeypatch.setattr(corpus_module, "BUILD_WORKERS", 4)
+    monkeypatch.setattr(corpus_module, "ProcessPoolExecutor", no_pool)
+    corpus = PostCorpus(str(tmp_path))
+    assert corpus.refresh()
+    assert len(corpus.posts()) == PARALLEL_THRESHOLD + 10
@@ -0,0 +1,58 @@
+"""静态导出：分类 / 标签 / slug 中的 URL 特殊字符须转义后请求，导出到解码后的路径"""
+
+import os
+
+import freeze
+from freeze import _exportable, _quote_path
+
+
+def test_quote_path():
+    assert _quote_path("/blog/tag/C#") == "/blog/tag/C%23"
+    assert _quote_path("/blog/tag/a?b") == "/blog/tag/a%3Fb"
+    assert _quote_path("/blog/tag/50%") == "/blog/tag/50%25"
+    assert _quote_path("/blog/tech/2026-01-01-csharp") == "/blog/tech/2026-01-01-csharp"
+
+
+def test_unexportable_segments_skipped():
+    for value in ("", ".", "..", "a/b", "a\\b", "tab\there", "x" * 300, "\ud800"):
+        assert not _exportable(value), repr(value)
+    assert _exportable("C#") and _exportable("编程")
+    assert _exportable("tech/2026-01-01-csharp", nested=True)
+    assert not _exportable("tech/../x", nested=True)
+
+
+def test_freeze_special_tags(tmp_path):
+    out = str(tmp_path)
+    freeze.freeze(out, full=True)
+    for tag in ("C#", "a?b", "50%"):
+        with open(os.path.join(out, "blog", "tag", tag, "index.html"), encoding="utf-8") as f:
+            assert "C# 入门" in f.read(), tag
+    assert not os.path.exists(os.path.join(out, "blog", "tag", "C", "index.html"))
+    assert os.path.exists(os.path.join(out, "blog", "tech", "2026-01-01-csharp", "index.html"))
+
+
+def test_concurrent_writes_do_not_share_temp_file(tmp_path, monkeypatch):
+    import threading
+    from freeze import _write
+
+    seen = []
+    real_replace = os.replace
+    barrier = threading.Barrier(2)
+
+    def replace(src, dst):
+        seen.append(src)
+        barrier.wait(5)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(freeze.os, "replace", replace)
+    threads = [threading.Thread(target=_write, args=(str(tmp_path), "blog/index.html", data))
+               for data in (b"a" * 100000, b"b" * 100000)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert len(set(seen)) == 2
+    content = (tmp_path / "blog" / "index.html").read_bytes()
+    assert content in (b"a" * 100000, b"b" * 100000)
+    assert os.listdir(tmp_path / "blog") == ["index.html"]
+    assert os.stat(tmp_path / "blog" / "index.html").st_mode & 0o777 == 0o644
@@ -0,0 +1,17 @@
+"""相关文章：重建时读取正文不经过完整文章 LRU"""
+
+import pytest
+
+pytest.importorskip("scipy")
+
+from corpus import corpus  # noqa: E402
+from related import RelatedIndex  # noqa: E402
+
+
+def test_rebuild_does_not_fill_full_post_lru():
+    corpus.refresh()
+    corpus._full.clear()
+    index = RelatedIndex(k=2)
+    index.refresh(corpus.listing(), corpus.version)
+    assert index.version == corpus.version
+    assert len(corpus._full) == 0
@@ -0,0 +1,56 @@
+"""搜索分页游标：被篡改的游标按第一页处理，不能导致 500"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("BLOG_WATCH", "off")
+
+from search_index import (cursor_key, cursor_for, cursor_offset, encode_cursor,  # noqa: E402
+                          MAX_SEARCH_OFFSET)
+from datetime import datetime  # noqa: E402
+
+
+def test_roundtrip():
+    meta = {"slug": "ai/x", "date": datetime(2026, 3, 1, 12, 0)}
+    assert cursor_key(cursor_for((3.5, meta))) == (3.5, datetime(2026, 3, 1, 12, 0), "ai/x")
+
+
+def test_tampered_cursor_rejected():
+    bad = [
+        ["x", "2020-01-01T00:00:00", "a"],
+        [True, "2020-01-01T00:00:00", "a"],
+        [1, "2020-01-01T00:00:00+08:00", "a"],
+        [1, "not-a-date", "a"],
+        [1, 20200101, "a"],
+        [1, "2020-01-01T00:00:00", 5],
+        [1, "2020-01-01T00:00:00"],
+        {"score": 1},
+    ]
+    for value in bad:
+        assert cursor_key(encode_cursor(value)) is None, value
+    assert cursor_key("%%%not-base64") is None
+
+
+def test_offset_cursor_bounds():
+    assert cursor_offset(encode_cursor(40)) == 40
+    assert cursor_offset(encode_cursor(MAX_SEARCH_OFFSET)) == MAX_SEARCH_OFFSET
+    for value in (99999999999999999999999999, MAX_SEARCH_OFFSET + 1, -20, 0, 1.5, True, "40", [40]):
+        assert cursor_offset(encode_cursor(value)) == 0, value
+    assert cursor_offset(None) == 0
+
+
+def test_fts_search_huge_offset(monkeypatch):
+    import app as blog
+    from database import fts_available, sync_posts_from_files
+
+    with blog.app.app_context():
+        sync_posts_from_files(blog.POSTS_DIR, workers=1)
+        if not fts_available():
+            pytest.skip("SQLite 未编译 FTS5")
+    monkeypatch.setattr(blog, "SEARCH_BACKEND", "fts")
+    client = blog.app.test_client()
+    for offset in (99999999999999999999999999, 2 ** 63):
+        resp = client.get("/blog/search", query_string={"q": "入门", "cursor": encode_cursor(offset)})
+        assert resp.status_code == 200
+        assert len(resp.get_json()["results"]) == 2
@@ -0,0 +1,51 @@
+"""倒排索引：建索引不经过完整文章 LRU，且不阻塞使用旧索引的查询"""
+
+import threading
+
+from corpus import corpus
+from search_index import InvertedIndex, _load_text
+
+
+def _meta(slug: str, title: str) -> dict:
+    return {"slug": slug, "title": title, "summary": "", "tags": [], "category": "c", "date": None}
+
+
+def test_sync_does_not_fill_full_post_lru():
+    corpus.refresh()
+    corpus._full.clear()
+    index = InvertedIndex()
+    index.sync(corpus.listing(), corpus.version, _load_text)
+    assert index.search("入门")
+    assert len(corpus._full) == 0
+
+
+def test_queries_use_previous_index_while_rebuilding():
+    index = InvertedIndex()
+    old = [_meta("a", "python 入门")]
+    index.sync(old, 1, lambda meta: "")
+
+    loading, release = threading.Event(), threading.Event()
+
+    def slow_text(meta):
+        loading.set()
+        release.wait(5)
+        return ""
+
+    new = old + [_meta("b", "python 进阶")]
+    builder = threading.Thread(target=index.sync, args=(new, 2, slow_text))
+    builder.start()
+    try:
+        assert loading.wait(5)
+        # 另一个线程正在建索引：不等待，沿用旧索引
+        assert index.sync(new, 2, slow_text) is False
+        assert [meta["slug"] for _, meta in index.search("python")] == ["a"]
+    finally:
+        release.set()
+        builder.join(5)
+    assert index.version == 2
+    assert sorted(meta["slug"] for _, meta in index.search("python")) == ["a", "b"]
+
+
+def test_load_text_matches_rendered_post():
+    meta = next(p for p in corpus.listing() if p["title"] == "大模型 简报")
+    assert "大模型 发布" in _load_text(meta)
@@ -0,0 +1,36 @@
+"""搜索分页：按 next_cursor 逐页取完的结果与一次取出的结果一致，不重复、不遗漏"""
+
+import pytest
+
+import app as blog
+from database import fts_available, sync_posts_from_files
+
+
+def _collect(client, q: str, limit: int) -> list:
+    slugs, cursor = [], None
+    for _ in range(20):
+        params = {"q": q, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/blog/search", query_string=params).get_json()
+        slugs += [r["slug"] for r in data["results"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return slugs
+    raise AssertionError("分页没有结束")
+
+
+@pytest.mark.parametrize("backend", ["index", "fts"])
+def test_pages_match_single_query(backend, monkeypatch):
+    if backend == "fts":
+        with blog.app.app_context():
+            sync_posts_from_files(blog.POSTS_DIR, workers=1)
+            if not fts_available():
+                pytest.skip("SQLite 未编译 FTS5")
+    monkeypatch.setattr(blog, "SEARCH_BACKEND", backend)
+    client = blog.app.test_client()
+
+    everything = _collect(client, "入门", 50)
+    assert len(everything) == 2
+    paged = _collect(client, "入门", 1)
+    assert paged == everything
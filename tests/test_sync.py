@@ -0,0 +1,106 @@
+"""增量同步到数据库：改名保留阅读统计，疑似目录异常时不批量删除"""
+
+import os
+import shutil
+
+import pytest
+
+import corpus as corpus_module
+from corpus import PostCorpus
+from models import db, Post, ViewLog
+
+
+@pytest.fixture
+def sync(tmp_path, monkeypatch):
+    """以 tmp_path 为文章目录、清空文章表后同步；返回 (同步函数, 文章目录)"""
+    import app as blog
+    from database import sync_posts_from_files, _delete_posts
+
+    posts_dir = str(tmp_path / "posts")
+    os.makedirs(posts_dir)
+    # slug 相对于 corpus.POSTS_DIR 计算
+    monkeypatch.setattr(corpus_module, "POSTS_DIR", posts_dir)
+    monkeypatch.setattr(corpus_module, "corpus", PostCorpus(posts_dir))
+
+    with blog.app.app_context():
+        _delete_posts([i for (i,) in db.session.query(Post.id)])
+        db.session.commit()
+        yield (lambda **kwargs: sync_posts_from_files(posts_dir, workers=1, **kwargs)), posts_dir
+        _delete_posts([i for (i,) in db.session.query(Post.id)])
+        db.session.commit()
+
+
+def _write(posts_dir: str, n: int):
+    for i in range(n):
+        path = os.path.join(posts_dir, "tech", f"2026-01-{i + 1:02d}-p{i}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"---\ntitle: 文章 {i}\ndate: 2026-01-{i + 1:02d}\ntags: ['t']\n---\n\n正文 {i}\n")
+
+
+def test_rename_keeps_views(sync):
+    run, posts_dir = sync
+    _write(posts_dir, 3)
+    assert run()["created"] == 3
+    post = Post.query.filter_by(slug="tech/2026-01-01-p0").one()
+    post.views = 7
+    db.session.add(ViewLog(post_id=post.id, ip_address="1.1.1.1", user_agent="ua"))
+    db.session.commit()
+    post_id = post.id
+
+    os.makedirs(os.path.join(posts_dir, "ai"))
+    os.rename(os.path.join(posts_dir, "tech", "2026-01-01-p0.md"), os.path.join(posts_dir, "ai", "renamed.md"))
+    stats = run()
+    assert stats["renamed"] == 1 and stats["deleted"] == 0 and stats["created"] == 0
+    moved = Post.query.filter_by(slug="ai/renamed").one()
+    assert moved.id == post_id and moved.views == 7 and moved.category == "ai"
+    assert ViewLog.query.filter_by(post_id=post_id).count() == 1
+    assert Post.query.filter_by(slug="tech/2026-01-01-p0").first() is None
+
+
+def test_delete_guard(sync):
+    run, posts_dir = sync
+    _write(posts_dir, 20)
+    run()
+
+    # 少量删除照常进行
+    os.remove(os.path.join(posts_dir, "tech", "2026-01-01-p0.md"))
+    assert run()["deleted"] == 1
+
+    # 超过比例：不删除，确认后 allow_delete 才删除
+    for i in range(1, 11):
+        os.remove(os.path.join(posts_dir, "tech", f"2026-01-{i + 1:02d}-p{i}.md"))
+    stats = run()
+    assert stats["deleted"] == 0 and stats["delete_skipped"] == 10
+    assert Post.query.count() == 19
+    assert run(allow_delete=True)["deleted"] == 10
+    assert Post.query.count() == 9
+
+    # 目录为空（如未挂载）：一篇都不删
+    shutil.rmtree(posts_dir)
+    os.makedirs(posts_dir)
+    stats = run()
+    assert stats["deleted"] == 0 and stats["delete_skipped"] == 9
+    assert Post.query.count() == 9
+
+
+def test_incremental_sync(sync):
+    run, posts_dir = sync
+    _write(posts_dir, 3)
+    assert run()["created"] == 3
+
+    stats = run()
+    assert stats["unchanged"] == 3 and stats["created"] == stats["updated"] == 0
+
+    # 内容不变只改了文件戳：只刷新文件戳，不重新渲染
+    path = os.path.join(posts_dir, "tech", "2026-01-01-p0.md")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    stats = run()
+    assert stats["touched"] == 1 and stats["updated"] == 0
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n补充内容\n")
+    stats = run()
+    assert stats["updated"] == 1 and stats["unchanged"] == 2
+    assert "补充内容" in Post.query.filter_by(slug="tech/2026-01-01-p0").one().content_html
@@ -0,0 +1,63 @@
+"""阅读统计汇总：在数据库中按时段聚合，首次汇总按天分块回填，可重复执行"""
+
+from datetime import datetime, timedelta
+
+from models import db, Post, ViewLog, ViewStatHourly, ViewStatDaily, RollupState
+from view_stats import rollup_views
+
+
+def test_rollup_backfill():
+    import app as blog
+    from database import sync_posts_from_files
+
+    with blog.app.app_context():
+        sync_posts_from_files(blog.POSTS_DIR, workers=1)
+        for model in (ViewLog, ViewStatHourly, ViewStatDaily, RollupState):
+            model.query.delete()
+        post_id = db.session.query(Post.id).order_by(Post.id).first()[0]
+        base = datetime(2026, 1, 1, 10, 15)
+        logs = []
+        # 三天（中间隔一天空白），每天 10 点 3 次阅读（2 个访客）、11 点 1 次
+        for day in (0, 1, 3):
+            t = base + timedelta(days=day)
+            logs += [(t, "1.1.1.1", "ua"), (t, "1.1.1.1", "ua"), (t, "2.2.2.2", "ua"),
+                     (t + timedelta(hours=1), "1.1.1.1", "ua")]
+        db.session.execute(ViewLog.__table__.insert(), [
+            {"post_id": post_id, "viewed_at": ts, "ip_address": ip, "user_agent": ua} for ts, ip, ua in logs])
+        db.session.commit()
+
+        now = datetime(2026, 1, 10)
+        assert rollup_views(now) == {"hourly": 6, "daily": 3}
+        daily = {row.day.isoformat(): (row.views, row.visitors) for row in ViewStatDaily.query}
+        assert daily == {"2026-01-01": (4, 2), "2026-01-02": (4, 2), "2026-01-04": (4, 2)}
+        hourly = {row.hour: (row.views, row.visitors) for row in ViewStatHourly.query}
+        assert hourly[datetime(2026, 1, 4, 10)] == (3, 2)
+        assert hourly[datetime(2026, 1, 4, 11)] == (1, 1)
+
+        # 水位线已推进到 now，再次执行不重复计数
+        assert rollup_views(now) == {"hourly": 0, "daily": 0}
+        assert ViewStatDaily.query.count() == 3
+
+
+def test_daily_counts_tail_uses_viewed_at_index():
+    import app as blog
+    from sqlalchemy import event
+    from view_stats import _daily_counts
+
+    with blog.app.app_context():
+        RollupState.query.delete()
+        db.session.commit()
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "view_logs" in statement:
+                statements.append((statement, parameters))
+
+        event.listen(db.engine, "before_cursor_execute", capture)
+        try:
+            _daily_counts("category", datetime(2026, 1, 1).date(), datetime(2026, 2, 1).date(), {})
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture)
+        statement, parameters = statements[-1]
+        plan = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        assert any("ix_view_logs_viewed_at_post_id" in row[-1] for row in plan), plan
@@ -0,0 +1,28 @@
+"""posts/ 监听：fork 出的子进程不继承监听线程，须在本进程中重新启动"""
+
+import os
+
+import watcher
+from corpus import PostCorpus
+
+
+def test_restart_after_fork(tmp_path, monkeypatch):
+    corpus = PostCorpus(str(tmp_path))
+    post_watcher = watcher.start_watcher(corpus, mode="poll", start=False)
+    assert not corpus.watched
+
+    post_watcher.ensure_started()
+    parent_thread, parent_stop = post_watcher._thread, post_watcher._stop
+    assert corpus.watched and parent_thread.is_alive()
+
+    # 模拟 fork：子进程的 pid 不同，继承来的线程对象在子进程中并不运行
+    child_pid = os.getpid() + 1
+    monkeypatch.setattr(watcher.os, "getpid", lambda: child_pid)
+    post_watcher.ensure_started()
+    assert post_watcher._thread is not parent_thread
+    assert post_watcher._thread.is_alive() and corpus.watched
+
+    post_watcher.stop()
+    # "父进程"的线程在测试进程中真实存在，一并停止
+    parent_stop.set()
+    parent_thread.join(timeout=5)
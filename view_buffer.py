@@ -0,0 +1,143 @@
+"""
+阅读量写缓冲（write-behind）
+文章详情页只把阅读记录写入进程内缓冲，由后台线程按时间间隔或积压条数批量落库：
+  UPDATE posts SET views = views + n（executemany）+ 多行 INSERT view_logs，一次提交
+页面显示的阅读量 = 数据库中的值 + 尚未落库的增量
+进程退出时（atexit）写出剩余数据；进程崩溃最多丢失一个刷新间隔或 FLUSH_SIZE 条记录
+"""
+
+import os
+import atexit
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import bindparam, func
+
+from models import db, Post, ViewLog
+
+logger = logging.getLogger(__name__)
+
+# 刷新间隔（秒）与触发立即刷新的积压条数；BLOG_VIEW_BUFFER=off 时每次阅读同步写库
+FLUSH_INTERVAL = float(os.environ.get("BLOG_VIEW_FLUSH_INTERVAL", "5"))
+FLUSH_SIZE = int(os.environ.get("BLOG_VIEW_FLUSH_SIZE", "200"))
+BUFFER_ENABLED = os.environ.get("BLOG_VIEW_BUFFER", "on").lower() != "off"
+# 数据库持续不可用时最多保留的日志条数（阅读量增量不受影响），超出后丢弃最旧的日志
+MAX_PENDING_LOGS = FLUSH_SIZE * 50
+
+
+class ViewBuffer:
+    """线程安全的阅读量缓冲，落库在独立的应用上下文中进行"""
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, flush_size: int = FLUSH_SIZE,
+                 enabled: bool = BUFFER_ENABLED):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.enabled = enabled
+        self.app = None
+        self.dropped_logs = 0
+        self._counts = {}        # post_id -> 未落库的阅读增量
+        self._logs = []          # 未落库的阅读日志行
+        self._inflight = {}      # 正在落库的增量，提交前仍计入显示
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self.app = app
+
+    # ── 记录 ──────────────────────────────────────────────────────────────────
+
+    def record(self, post_id: int, ip_address: str = None, user_agent: str = None) -> int:
+        """记录一次阅读，返回该文章尚未落库的增量（含本次）"""
+        with self._lock:
+            self._counts[post_id] = self._counts.get(post_id, 0) + 1
+            self._logs.append({
+                "post_id": post_id,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "viewed_at": datetime.utcnow(),
+            })
+            if len(self._logs) > MAX_PENDING_LOGS:
+                del self._logs[0]
+                self.dropped_logs += 1
+            backlog = len(self._logs)
+
+        if not self.enabled:
+            self.flush()
+        else:
+            self._ensure_thread()
+            if backlog >= self.flush_size:
+                self._wake.set()
+        return self.pending(post_id)
+
+    def pending(self, post_id: int) -> int:
+        with self._lock:
+            return self._counts.get(post_id, 0) + self._inflight.get(post_id, 0)
+
+    # ── 落库 ──────────────────────────────────────────────────────────────────
+
+    def flush(self) -> int:
+        """把缓冲中的数据批量写入数据库，返回写入的阅读次数；失败时数据放回缓冲等待重试"""
+        with self._flush_lock:
+            with self._lock:
+                counts, logs = self._counts, self._logs
+                self._counts, self._logs = {}, []
+                self._inflight = counts
+            if not counts:
+                return 0
+
+            posts = Post.__table__
+            try:
+                with self.app.app_context():
+                    db.session.execute(
+                        posts.update()
+                        .where(posts.c.id == bindparam("b_id"))
+                        .values(views=func.coalesce(posts.c.views, 0) + bindparam("b_n")),
+                        [{"b_id": pid, "b_n": n} for pid, n in counts.items()],
+                    )
+                    if logs:
+                        db.session.execute(ViewLog.__table__.insert(), logs)
+                    db.session.commit()
+            except Exception:
+                logger.exception("阅读量落库失败，%d 条记录保留在缓冲中等待重试", len(logs))
+                with self.app.app_context():
+                    db.session.rollback()
+                with self._lock:
+                    for pid, n in counts.items():
+                        self._counts[pid] = self._counts.get(pid, 0) + n
+                    # 失败的批次比落库期间新记录的更早，合并后超出上限时同样丢弃最旧的
+                    self._logs[:0] = logs
+                    overflow = len(self._logs) - MAX_PENDING_LOGS
+                    if overflow > 0:
+                        del self._logs[:overflow]
+                        self.dropped_logs += overflow
+                    self._inflight = {}
+                return 0
+
+            with self._lock:
+                self._inflight = {}
+            return sum(counts.values())
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="view-flush", daemon=True)
+            self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("阅读量刷新线程异常")
+
+
+view_buffer = ViewBuffer()
@@ -0,0 +1,116 @@
+"""
+阅读去重与爬虫过滤
+同一 (文章, IP, User-Agent) 在时间窗口内的重复阅读（刷新、预取、反复打开）不再计数，也不写库；
+已知爬虫 / 脚本的 User-Agent 直接忽略
+
+去重使用轮转的 Bloom filter：窗口分为若干时间片，每个时间片一个固定大小的位图，
+过期的时间片整体清空复用，内存与访问量无关（默认约 0.7 MB）
+代价是极小概率的误判：误判率按 CAPACITY 估算，超出容量后升高，误判的阅读按重复阅读处理
+每个进程各有一份窗口，多 worker 部署时同一访客落到不同 worker 仍可能各计一次
+"""
+
+import os
+import re
+import math
+import time
+import hashlib
+import threading
+
+# 去重窗口（秒），0 关闭去重
+DEDUP_WINDOW = float(os.environ.get("BLOG_VIEW_DEDUP_WINDOW", "1800"))
+# 每个时间片预计的不同阅读数，决定位图大小
+DEDUP_CAPACITY = int(os.environ.get("BLOG_VIEW_DEDUP_CAPACITY", "100000"))
+# 时间片数：记录在窗口到窗口 + 一个时间片之间过期
+DEDUP_SLICES = 4
+# 容量内的目标误判率
+FALSE_POSITIVE_RATE = 0.001
+
+# 已知爬虫、预览抓取与脚本客户端；空 User-Agent 同样视为非浏览器
+_BOT_RE = re.compile(
+    r"bot|crawl|spider|slurp|scrap|fetch|preview|monitor|headless|phantomjs|lighthouse|"
+    r"curl|wget|python-|requests|aiohttp|httpx|go-http|java/|okhttp|node-fetch|axios|"
+    r"facebookexternalhit|embedly|bingpreview|feed|rss",
+    re.IGNORECASE,
+)
+
+
+def is_bot(user_agent: str) -> bool:
+    return not user_agent or _BOT_RE.search(user_agent) is not None
+
+
+class RotatingBloomFilter:
+    """
+    时间窗口 Bloom filter：slices 个位图轮转，查询时检查全部未过期位图，插入只写当前位图
+    seen_or_add 为原子操作（加锁），返回插入前是否已存在
+    """
+
+    def __init__(self, window: float, capacity: int, slices: int = DEDUP_SLICES,
+                 fp_rate: float = FALSE_POSITIVE_RATE):
+        self.slice_seconds = window / (slices - 1)
+        self.bits = max(64, int(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._filters = [bytearray((self.bits + 7) // 8) for _ in range(slices)]
+        self._epoch = None
+        self._lock = threading.Lock()
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(len(f) for f in self._filters)
+
+    def _positions(self, key: bytes) -> list:
+        # 双重哈希：一次 blake2b 派生 k 个位置
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def _rotate(self, now: float):
+        epoch = int(now // self.slice_seconds)
+        if self._epoch is None:
+            self._epoch = epoch
+            return
+        steps = min(epoch - self._epoch, len(self._filters))
+        for _ in range(steps):
+            # 最旧的位图清空后作为新的当前位图
+            oldest = self._filters.pop()
+            oldest[:] = bytes(len(oldest))
+            self._filters.insert(0, oldest)
+        if steps > 0:
+            self._epoch = epoch
+
+    def seen_or_add(self, key: bytes, now: float = None) -> bool:
+        positions = self._positions(key)
+        with self._lock:
+            self._rotate(time.monotonic() if now is None else now)
+            for bitmap in self._filters:
+                if all(bitmap[p >> 3] & (1 << (p & 7)) for p in positions):
+                    return True
+            current = self._filters[0]
+            for p in positions:
+                current[p >> 3] |= 1 << (p & 7)
+            return False
+
+
+class ViewDeduplicator:
+    """判断一次阅读是否计数，并统计被过滤的次数"""
+
+    def __init__(self, window: float = DEDUP_WINDOW, capacity: int = DEDUP_CAPACITY):
+        self.filter = RotatingBloomFilter(window, capacity) if window > 0 else None
+        self.skipped_bots = 0
+        self.skipped_repeats = 0
+
+    def should_count(self, post_id: int, ip_address: str = None, user_agent: str = None,
+                     now: float = None) -> bool:
+        if is_bot(user_agent):
+            self.skipped_bots += 1
+            return False
+        if self.filter is None:
+            return True
+        key = f"{post_id}\x00{ip_address or ''}\x00{user_agent}".encode("utf-8", "replace")
+        if self.filter.seen_or_add(key, now):
+            self.skipped_repeats += 1
+            return False
+        return True
+
+
+view_dedup = ViewDeduplicator()
@@ -0,0 +1,291 @@
+"""
+阅读统计汇总与日志保留
+- rollup_views：把 view_logs 原始记录汇总为按小时 / 按天的每篇文章阅读量与访客数
+  （同一 IP + UA 视为同一访客），只处理已经结束的时段，可重复执行
+- prune_view_logs：删除超过保留天数且已汇总过的原始日志，小时汇总另有较长的保留期
+- 统计查询读汇总表，不扫描原始日志
+需在应用上下文中调用；命令行入口见 rollup_views.py
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, time as dtime
+
+from sqlalchemy import func
+
+from models import db, Post, Tag, ViewLog, ViewStatHourly, ViewStatDaily, RollupState, post_tags
+
+logger = logging.getLogger(__name__)
+
+# 原始阅读日志保留天数（只删除已汇总过的部分）
+RETENTION_DAYS = int(os.environ.get("BLOG_VIEWLOG_RETENTION_DAYS", "30"))
+# 小时汇总保留天数；按天汇总永久保留
+HOURLY_RETENTION_DAYS = int(os.environ.get("BLOG_VIEW_HOURLY_RETENTION_DAYS", "90"))
+# 时段结束后再等待一段时间才汇总，给阅读量缓冲（view_buffer）落库留出余量
+ROLLUP_GRACE = timedelta(minutes=5)
+# 分批删除的行数
+BATCH_SIZE = 5000
+# 趋势查询结果缓存秒数与条数，仪表盘频繁刷新时不重复查询
+ANALYTICS_CACHE_TTL = float(os.environ.get("BLOG_ANALYTICS_CACHE_TTL", "10"))
+ANALYTICS_CACHE_SIZE = 64
+# 趋势查询的分组方式与时间粒度
+SERIES_GROUPS = ("post", "category", "tag")
+SERIES_INTERVALS = ("day", "week")
+
+
+def _floor_hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _floor_day(ts: datetime) -> datetime:
+    return datetime.combine(ts.date(), dtime.min)
+
+
+def _get_watermark(name: str) -> datetime | None:
+    state = db.session.get(RollupState, name)
+    return state.watermark if state else None
+
+
+def _set_watermark(name: str, value: datetime):
+    state = db.session.get(RollupState, name)
+    if state:
+        state.watermark = value
+    else:
+        db.session.add(RollupState(name=name, watermark=value))
+
+
+def _aggregate(start: datetime, end: datetime) -> list:
+    """[start, end) 内的原始日志在数据库中按文章聚合：[(post_id, 阅读数, 访客数), ...]"""
+    visitor = func.coalesce(ViewLog.ip_address, "") + "\x1f" + func.coalesce(ViewLog.user_agent, "")
+    return (db.session.query(ViewLog.post_id, func.count(ViewLog.id), func.count(visitor.distinct()))
+            .filter(ViewLog.viewed_at >= start, ViewLog.viewed_at < end)
+            .group_by(ViewLog.post_id)
+            .all())
+
+
+def _rollup(name: str, model, column: str, floor, step: timedelta, to_value, now: datetime) -> int:
+    """
+    把 watermark 到当前已结束时段之间的日志汇总进 model，返回写入的汇总行数
+    按天分块处理：每块逐个时段在数据库中聚合，写入后推进 watermark 并提交，
+    首次汇总已有大量日志的站点时内存与单个事务都有上限，中断后从上次提交处继续
+    """
+    end = floor(now - ROLLUP_GRACE)
+    start = _get_watermark(name)
+    if start is None:
+        first = db.session.query(func.min(ViewLog.viewed_at)).scalar()
+        if first is None:
+            return 0
+        start = floor(first)
+
+    bucket_col = getattr(model, column)
+    written = 0
+    while start < end:
+        # 跳过没有日志的时段
+        first = (db.session.query(func.min(ViewLog.viewed_at))
+                 .filter(ViewLog.viewed_at >= start, ViewLog.viewed_at < end).scalar())
+        if first is None:
+            _set_watermark(name, end)
+            db.session.commit()
+            break
+        start = max(start, floor(first))
+        chunk_end = min(_floor_day(start) + timedelta(days=1), end)
+
+        rows = []
+        bucket = start
+        while bucket < chunk_end:
+            rows += [{"post_id": post_id, column: to_value(bucket), "views": views, "visitors": visitors}
+                     for post_id, views, visitors in _aggregate(bucket, bucket + step)]
+            bucket += step
+        # 同一时段重复汇总时先删除旧结果，保证可重复执行
+        model.query.filter(bucket_col >= to_value(start), bucket_col < to_value(chunk_end)) \
+            .delete(synchronize_session=False)
+        if rows:
+            db.session.execute(model.__table__.insert(), rows)
+        _set_watermark(name, chunk_end)
+        db.session.commit()
+        written += len(rows)
+        start = chunk_end
+    return written
+
+
+def rollup_views(now: datetime = None) -> dict:
+    """汇总已结束的小时与天，返回 {"hourly": 行数, "daily": 行数}"""
+    now = now or datetime.utcnow()
+    stats = {
+        "hourly": _rollup("hourly", ViewStatHourly, "hour", _floor_hour, timedelta(hours=1),
+                          lambda ts: ts, now),
+        "daily": _rollup("daily", ViewStatDaily, "day", _floor_day, timedelta(days=1),
+                         lambda ts: ts.date(), now),
+    }
+    logger.info("阅读统计汇总完成: %s", stats)
+    return stats
+
+
+def prune_view_logs(retention_days: int = RETENTION_DAYS,
+                    hourly_retention_days: int = HOURLY_RETENTION_DAYS,
+                    now: datetime = None) -> dict:
+    """
+    删除早于保留期的原始日志（不会删除尚未按天汇总的日志）以及过期的小时汇总
+    返回 {"view_logs": 删除行数, "hourly": 删除行数}
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=retention_days)
+    daily_watermark = _get_watermark("daily")
+    cutoff = min(cutoff, daily_watermark) if daily_watermark else None
+
+    deleted_logs = 0
+    while cutoff is not None:
+        ids = [row[0] for row in db.session.query(ViewLog.id)
+               .filter(ViewLog.viewed_at < cutoff).limit(BATCH_SIZE).all()]
+        if not ids:
+            break
+        ViewLog.query.filter(ViewLog.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted_logs += len(ids)
+
+    hourly_cutoff = _floor_hour(now - timedelta(days=hourly_retention_days))
+    deleted_hourly = ViewStatHourly.query.filter(ViewStatHourly.hour < hourly_cutoff) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+
+    stats = {"view_logs": deleted_logs, "hourly": deleted_hourly}
+    logger.info("阅读日志清理完成: %s", stats)
+    return stats
+
+
+# ── 统计查询（只读汇总表）────────────────────────────────────────────────────
+
+def top_posts_since(days: int = 7, limit: int = 10) -> list:
+    """最近 days 天（已汇总的完整日期）阅读量最高的文章：[(Post, 阅读量, 访客数), ...]"""
+    since = datetime.utcnow().date() - timedelta(days=days)
+    views = func.sum(ViewStatDaily.views).label("views")
+    rows = (db.session.query(Post, views, func.sum(ViewStatDaily.visitors))
+            .join(ViewStatDaily, ViewStatDaily.post_id == Post.id)
+            .filter(ViewStatDaily.day >= since)
+            .group_by(Post.id)
+            .order_by(views.desc())
+            .limit(limit)
+            .all())
+    return [(post, int(v or 0), int(u or 0)) for post, v, u in rows]
+
+
+# ── 阅读趋势（按天 / 周，按文章 / 分类 / 标签分组）──────────────────────────────
+
+_series_cache = OrderedDict()
+_series_lock = threading.Lock()
+
+
+def _as_date(value) -> date:
+    # SQLite 的 date() 返回字符串，MySQL 返回 date
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _series_query(source, group: str, filters: dict):
+    """source 为 ViewStatDaily 或 ViewLog，返回按分组键过滤后的查询（尚未选择列）"""
+    if group == "post":
+        key = Post.id
+    elif group == "category":
+        key = Post.category
+    else:
+        key = Tag.name
+    query = db.session.query(key.label("key")).join(Post, Post.id == source.post_id)
+    if group == "tag" or filters.get("tag"):
+        query = query.join(post_tags, post_tags.c.post_id == Post.id).join(Tag, Tag.id == post_tags.c.tag_id)
+    if filters.get("category"):
+        query = query.filter(Post.category == filters["category"])
+    if filters.get("tag"):
+        query = query.filter(Tag.name == filters["tag"])
+    if filters.get("slug"):
+        query = query.filter(Post.slug == filters["slug"])
+    return query, key
+
+
+def _daily_counts(group: str, start: date, end: date, filters: dict) -> dict:
+    """
+    [start, end) 每天每个分组的阅读量：{(key, day): views}
+    已按天汇总的日期读 view_stats_daily，之后（含当天）直接聚合 view_logs，两段以 daily 水位线为界
+    """
+    watermark = _get_watermark("daily")
+    split = min(max(watermark.date(), start), end) if watermark else start
+    counts = {}
+
+    if split > start:
+        query, key = _series_query(ViewStatDaily, group, filters)
+        rows = (query.add_columns(ViewStatDaily.day, func.sum(ViewStatDaily.views))
+                .filter(ViewStatDaily.day >= start, ViewStatDaily.day < split)
+                .group_by(key, ViewStatDaily.day))
+        for k, day, views in rows:
+            counts[(k, _as_date(day))] = int(views or 0)
+
+    if end > split:
+        query, key = _series_query(ViewLog, group, filters)
+        day = func.date(ViewLog.viewed_at)
+        rows = (query.add_columns(day, func.count(ViewLog.id))
+                .filter(ViewLog.viewed_at >= datetime.combine(split, dtime.min),
+                        ViewLog.viewed_at < datetime.combine(end, dtime.min))
+                .group_by(key, day))
+        for k, d, views in rows:
+            bucket = (k, _as_date(d))
+            counts[bucket] = counts.get(bucket, 0) + int(views)
+    return counts
+
+
+def view_series(group: str = "post", interval: str = "day", days: int = 30, limit: int = 10,
+                filters: dict = None, now: datetime = None) -> dict:
+    """
+    最近 days 天（UTC，含今天）的阅读趋势，取总阅读量最高的 limit 个分组
+    filters 可含 category / tag / slug；按周时以周一为一周的开始
+    返回 {"group", "interval", "from", "to", "buckets": [日期...],
+          "series": [{"key", "label", "total", "points": [与 buckets 对齐的阅读量]}]}
+    结果缓存 ANALYTICS_CACHE_TTL 秒
+    """
+    filters = {k: v for k, v in (filters or {}).items() if v}
+    cache_key = (group, interval, days, limit, tuple(sorted(filters.items())))
+    if now is None and ANALYTICS_CACHE_TTL > 0:
+        with _series_lock:
+            hit = _series_cache.get(cache_key)
+            if hit and hit[0] > time.monotonic():
+                return hit[1]
+
+    today = (now or datetime.utcnow()).date()
+    start = today - timedelta(days=days - 1)
+    counts = _daily_counts(group, start, today + timedelta(days=1), filters)
+
+    def bucket_of(day: date) -> date:
+        return day - timedelta(days=day.weekday()) if interval == "week" else day
+
+    buckets = sorted({bucket_of(start + timedelta(days=i)) for i in range(days)})
+    position = {b: i for i, b in enumerate(buckets)}
+    points = {}
+    for (k, day), views in counts.items():
+        row = points.setdefault(k, [0] * len(buckets))
+        row[position[bucket_of(day)]] += views
+
+    top = sorted(points.items(), key=lambda item: (-sum(item[1]), str(item[0])))[:limit]
+    labels = {}
+    if group == "post" and top:
+        labels = {pid: (slug, title) for pid, slug, title in db.session.query(Post.id, Post.slug, Post.title)
+                  .filter(Post.id.in_([k for k, _ in top]))}
+    series = []
+    for k, values in top:
+        slug, title = labels.get(k, (k, k))
+        series.append({"key": slug, "label": title, "total": sum(values), "points": values})
+
+    result = {
+        "group": group,
+        "interval": interval,
+        "from": start.isoformat(),
+        "to": today.isoformat(),
+        "buckets": [b.isoformat() for b in buckets],
+        "series": series,
+    }
+    if now is None and ANALYTICS_CACHE_TTL > 0:
+        with _series_lock:
+            _series_cache[cache_key] = (time.monotonic() + ANALYTICS_CACHE_TTL, result)
+            _series_cache.move_to_end(cache_key)
+            while len(_series_cache) > ANALYTICS_CACHE_SIZE:
+                _series_cache.popitem(last=False)
+    return result
@@ -0,0 +1,226 @@
+"""
+posts/ 目录监听
+Linux 下使用 inotify 订阅文件变更，其余平台退化为后台轮询
+变更以增量方式推送到 corpus，请求路径不再扫描文件系统
+"""
+
+import os
+import sys
+import errno
+import struct
+import select
+import ctypes
+import ctypes.util
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# inotify 事件掩码（见 <sys/inotify.h>）
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF   = 0x00000800
+IN_Q_OVERFLOW  = 0x00004000
+IN_IGNORED     = 0x00008000
+IN_ISDIR       = 0x40000000
+IN_NONBLOCK    = 0x00000800
+IN_CLOEXEC     = 0x00080000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+POLL_INTERVAL = float(os.environ.get("BLOG_WATCH_INTERVAL", "2"))
+
+
+# ── inotify 后端 ──────────────────────────────────────────────────────────────
+
+class InotifyBackend:
+    """通过 ctypes 调用 libc 的 inotify 接口，监听 posts/ 及其所有子目录"""
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.fd = fd
+        self._wd_paths = {}   # wd -> 目录路径
+
+    def add_tree(self, root: str):
+        """递归为 root 及其子目录添加监听（跳过隐藏目录）"""
+        for dirpath, dirs, _ in os.walk(root):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            self._add_watch(dirpath)
+
+    def _add_watch(self, path: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            logger.warning("无法监听目录 %s: %s", path, os.strerror(err))
+            return
+        self._wd_paths[wd] = os.path.normpath(path)
+
+    def run(self, stop: threading.Event):
+        while not stop.is_set():
+            ready, _, _ = select.select([self.fd], [], [], 1.0)
+            if not ready:
+                continue
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError as e:
+                if e.errno == errno.EAGAIN:
+                    continue
+                raise
+            self._dispatch(data)
+
+    def _dispatch(self, data: bytes):
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出，无法得知丢失了哪些变更，整体重新对账
+                logger.warning("inotify 事件队列溢出，重新扫描 posts/")
+                self.corpus.refresh()
+                continue
+            if mask & IN_IGNORED:
+                self._wd_paths.pop(wd, None)
+                continue
+
+            dirpath = self._wd_paths.get(wd)
+            if dirpath is None:
+                continue
+            path = os.path.join(dirpath, os.fsdecode(name)) if name else dirpath
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    if not os.path.basename(path).startswith("."):
+                        # 新目录：先加监听再补扫，避免漏掉创建目录后立即写入的文件
+                        self.add_tree(path)
+                        for root, dirs, files in os.walk(path):
+                            dirs[:] = [d for d in dirs if not d.startswith(".")]
+                            for f in files:
+                                self.corpus.update_file(os.path.join(root, f))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.corpus.discard_dir(path)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                self.corpus.update_file(path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.corpus.discard(path)
+
+    def close(self):
+        os.close(self.fd)
+
+
+# ── 轮询后端 ──────────────────────────────────────────────────────────────────
+
+class PollingBackend:
+    """不支持 inotify 时的退化方案：后台线程定期对账，扫描不占用请求时间"""
+
+    def __init__(self, corpus, interval: float = POLL_INTERVAL):
+        self.corpus = corpus
+        self.interval = interval
+
+    def add_tree(self, root: str):
+        pass
+
+    def run(self, stop: threading.Event):
+        while not stop.wait(self.interval):
+            self.corpus.refresh()
+
+    def close(self):
+        pass
+
+
+# ── 监听线程 ──────────────────────────────────────────────────────────────────
+
+class PostWatcher:
+    """在后台线程中监听 posts/ 变更，并维持 corpus.watched 标志"""
+
+    def __init__(self, corpus, mode: str = "auto"):
+        self.corpus = corpus
+        self.mode = mode
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _make_backend(self):
+        if self.mode in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                return InotifyBackend(self.corpus)
+            except (OSError, AttributeError) as e:
+                if self.mode == "inotify":
+                    raise
+                logger.warning("inotify 不可用（%s），改用轮询", e)
+        return PollingBackend(self.corpus)
+
+    def start(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        if self._pid is not None and self._pid != os.getpid():
+            # fork 出的子进程（如 gunicorn --preload）继承了 watched 标志与 inotify fd，但没有监听线程
+            self.corpus.watched = False
+            if self.backend is not None:
+                self.backend.close()
+            self._stop = threading.Event()
+            self._thread = None
+        self._pid = os.getpid()
+        os.makedirs(self.corpus.posts_dir, exist_ok=True)
+        self.backend = self._make_backend()
+        # 先订阅再做首次全量扫描，两者之间产生的变更不会丢失
+        self.backend.add_tree(self.corpus.posts_dir)
+        self.corpus.refresh()
+        self.corpus.watched = True
+        self._thread = threading.Thread(target=self._run, name="post-watcher", daemon=True)
+        self._thread.start()
+
+    def ensure_started(self):
+        """每个进程在处理第一个请求前启动自己的监听线程；本进程已启动时直接返回"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            self.start()
+
+    def _run(self):
+        try:
+            self.backend.run(self._stop)
+        except Exception:
+            logger.exception("posts/ 监听线程异常退出，回退到按请求校验")
+        finally:
+            # 监听失效后由请求路径自行校验，保证不会返回过期数据
+            self.corpus.watched = False
+            self.backend.close()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def start_watcher(corpus, mode: str = None, start: bool = True) -> PostWatcher | None:
+    """
+    启动监听，mode 取值：auto（默认）/ inotify / poll / off
+    可通过环境变量 BLOG_WATCH 配置
+    start=False 时只创建，由调用方在各个进程中调用 ensure_started()（导入后才 fork 的多进程部署）
+    """
+    mode = (mode or os.environ.get("BLOG_WATCH", "auto")).lower()
+    if mode == "off":
+        return None
+    watcher = PostWatcher(corpus, mode)
+    if start:
+        watcher.start()
+    return watcher